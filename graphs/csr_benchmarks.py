@@ -0,0 +1,54 @@
+""" compare a CSRGraph snapshot (Graph.freeze()) against the dict-based Graph it's built from, run w/
+`python csr_benchmarks.py [num_nodes]`, on a sparse directed graph of num_nodes nodes, each w/ 4 edges to random nodes.
+    memory:    the bytes allocated building each (traced w/ tracemalloc); the snapshot's includes its name <-> id maps, and
+               its three arrays alone are shown beside it.
+    traversal: the mean time of a BFS, a DFS and a full single-source shortest_path() from the same 5 random sources.
+               Graph's traversals are consumed as generators of node names, the snapshot's return arrays of node ids.
+Times are in milliseconds. """
+from random import Random
+from time import perf_counter
+import sys
+import tracemalloc
+
+from shortest_path_benchmarks import random_graph
+
+
+def traced(build):
+    """ return build()'s result and the number of bytes it allocated (and still holds). """
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+def mean_time(function, sources):
+    start = perf_counter()
+    for source in sources:
+        function(source)
+    return (perf_counter() - start) / len(sources) * 1e3
+
+def benchmark(num_nodes=100000):
+    rng = Random(0)
+    graph, graph_bytes = traced(lambda: random_graph(num_nodes, rng))
+    frozen, frozen_bytes = traced(graph.freeze)
+    print(f"{'memory':<12}{'MB':>9}{'ratio':>8}")
+    print(f"{'Graph':<12}{graph_bytes / 2 ** 20:>9.1f}{1:>8.1f}")
+    print(f"{'CSRGraph':<12}{frozen_bytes / 2 ** 20:>9.1f}{graph_bytes / frozen_bytes:>8.1f}")
+    print(f"{'  arrays':<12}{frozen.nbytes() / 2 ** 20:>9.1f}{graph_bytes / frozen.nbytes():>8.1f}")
+
+    sources = [rng.randrange(num_nodes) for _ in range(5)]
+    traversals = {
+        "BFS": (lambda source: list(graph.breadth_first_traverse(source)), frozen.breadth_first_order),
+        "DFS": (lambda source: list(graph.depth_first_traverse(source)), frozen.depth_first_order),
+        "shortest_path": (graph.shortest_path, frozen.shortest_path),
+    }
+    print(f"\n{'traversal':<16}{'Graph':>9}{'CSRGraph':>10}{'speedup':>9}")
+    for name, (dict_based, csr) in traversals.items():
+        dict_time, csr_time = mean_time(dict_based, sources), mean_time(csr, sources)
+        print(f"{name:<16}{dict_time:>9.1f}{csr_time:>10.1f}{dict_time / csr_time:>9.1f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,211 @@
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+import heapq
+import os
+
+import numpy as np
+
+
+class CSRGraph:
+    """ an immutable compressed sparse row (CSR) snapshot of a Graph, built by Graph.freeze(). Nodes are numbered 0 ... n - 1
+    (in the order they were added), and the outgoing edges of node i are indices[indptr[i]:indptr[i + 1]], w/ their weights at
+    the same positions in 'weights'. Three flat NumPy arrays replace a Node object and an edges dictionary per node, so the
+    snapshot takes a fraction of the memory, and traversals index into contiguous arrays rather than hashing node names.
+    'names' maps ids back to node names, and node_ids maps names to ids. """
+    def __init__(self, names, indptr, indices, weights, directed):
+        self.names = list(names)
+        self.node_ids = {name: node_id for node_id, name in enumerate(self.names)}
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.directed = directed
+
+    @classmethod
+    def from_adjacency(cls, adjacency, directed):
+        """ build a snapshot from a {node: {neighbour: weight}} dictionary. Edges to nodes that aren't keys of 'adjacency' are
+        left out. """
+        names = list(adjacency)
+        node_ids = {name: node_id for node_id, name in enumerate(names)}
+        degrees = np.fromiter((sum(neighbour in node_ids for neighbour in adjacency[name]) for name in names),
+                              dtype=np.int64, count=len(names))
+        indptr = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        num_edges = int(indptr[-1])
+        indices = np.fromiter((node_ids[neighbour] for name in names for neighbour in adjacency[name] if neighbour in node_ids),
+                              dtype=np.int32, count=num_edges)
+        weights = np.fromiter((weight for name in names for neighbour, weight in adjacency[name].items() if neighbour in node_ids),
+                              dtype=np.float64, count=num_edges)
+        return cls(names, indptr, indices, weights, directed)
+
+    @property
+    def num_nodes(self):
+        return len(self.names)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def node_id(self, node):
+        if node not in self.node_ids:
+            raise ValueError("Node doesn't exist.")
+        return self.node_ids[node]
+
+    def neighbours(self, node):
+        """ return the ids of the node's neighbours, as a view into 'indices'. """
+        node_id = self.node_id(node)
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+
+    def nbytes(self):
+        """ the memory used by the three CSR arrays, in bytes. """
+        return self.indptr.nbytes + self.indices.nbytes + self.weights.nbytes
+
+    def breadth_first_order(self, node):
+        """ return the ids of the nodes reachable from 'node', in the order Graph.breadth_first_search() visits them. The BFS is
+        level-synchronous: each iteration gathers the neighbours of the whole frontier w/ one vectorised operation, then keeps
+        the first occurrence of each unvisited node. As a sequential BFS appends neighbours in exactly this order, the result
+        is the same, but the per-node Python loop is replaced by a handful of NumPy calls per level. """
+        indptr, indices = self.indptr, self.indices
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        frontier = np.array([self.node_id(node)], dtype=np.int64)
+        visited[frontier] = True
+        levels = [frontier]
+        while len(frontier):
+            starts = indptr[frontier]
+            lengths = indptr[frontier + 1] - starts
+            total = int(lengths.sum())
+            if not total:
+                break
+            """ the positions of every frontier node's edges in 'indices', concatenated: each run starts at the node's
+            'indptr' entry and counts up by one. """
+            offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+            neighbours = indices[offsets + np.arange(total)]
+            neighbours = neighbours[~visited[neighbours]]
+            _, first = np.unique(neighbours, return_index=True)
+            frontier = neighbours[np.sort(first)].astype(np.int64)
+            visited[frontier] = True
+            levels.append(frontier)
+        return np.concatenate(levels)
+
+    def depth_first_order(self, node):
+        """ return the ids of the nodes reachable from 'node', in the order Graph.depth_first_search() visits them. The
+        recursion is replaced by an explicit stack of (node, position of its next edge) pairs, so deep graphs can't exceed the
+        recursion limit. The arrays are read as lists, as indexing them one element at a time is slower than a list. """
+        indptr, indices = self.indptr.tolist(), self.indices.tolist()
+        source = self.node_id(node)
+        visited = bytearray(self.num_nodes)
+        visited[source] = 1
+        order = [source]
+        stack = [(source, indptr[source])]
+        while stack:
+            current, position = stack[-1]
+            end = indptr[current + 1]
+            while position < end and visited[indices[position]]:
+                position += 1
+            if position == end:
+                stack.pop()
+                continue
+            stack[-1] = (current, position + 1)
+            neighbour = indices[position]
+            visited[neighbour] = 1
+            order.append(neighbour)
+            stack.append((neighbour, indptr[neighbour]))
+        return np.array(order, dtype=np.int64)
+
+    """ string forms matching Graph's, so a frozen graph can stand in for the original. """
+    def breadth_first_search(self, node):
+        return "".join(f"{self.names[node_id]} " for node_id in self.breadth_first_order(node).tolist())
+
+    def depth_first_search(self, node):
+        return "".join(f"{self.names[node_id]} " for node_id in self.depth_first_order(node).tolist())
+
+    def shortest_path(self, node):
+        """ Dijkstra's algorithm, as in Graph.shortest_path(), but returning a float64 array of distances indexed by node id
+        (inf for unreachable nodes). Nodes are settled one at a time, and most have only a few edges, which is too few for
+        NumPy's per-call overhead to pay off; so the arrays are read one element at a time through memoryviews, which index
+        about as fast as lists w/o copying the graph, and each node's edges are a contiguous slice of them rather than a
+        dictionary. """
+        return np.array(dijkstra(memoryview(self.indptr), memoryview(self.indices), memoryview(self.weights),
+                                 self.node_id(node)))
+
+    def multi_source_shortest_paths(self, sources, workers=None, context=None):
+        """ a generator running shortest_path() from each of 'sources' in parallel, over a pool of 'workers' processes
+        (os.cpu_count() by default), and yielding (source, distances) pairs in the order they finish. The three CSR arrays
+        are copied into shared memory once, and every worker reads them there in place, so the graph is neither pickled nor
+        copied per task or per worker; only a node id goes out and a distances array comes back. At most two tasks per worker
+        are in flight, so 'sources' may be a long (or lazy) iterable, and results don't pile up if they're consumed slowly.
+        'context' is the multiprocessing context the workers are started from, if not the default one. Stopping early
+        (e.g. breaking out of a for loop) cancels the remaining tasks and frees the shared memory. """
+        workers = workers or os.cpu_count()
+        blocks = []
+        executor = None
+        try:
+            specs = []
+            for array in (self.indptr, self.indices, self.weights):
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                blocks.append(block)
+                np.ndarray(array.shape, array.dtype, buffer=block.buf)[:] = array
+                specs.append((block.name, array.shape, array.dtype.str))
+            executor = ProcessPoolExecutor(workers, mp_context=context, initializer=attach_shared_graph,
+                                           initargs=(specs,))
+            sources = iter(sources)
+            pending = {}
+            while True:
+                for source in sources:
+                    pending[executor.submit(shared_shortest_path, self.node_id(source))] = source
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    return
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+
+def dijkstra(indptr, indices, weights, source):
+    """ the kernel of CSRGraph.shortest_path(), over the CSR arrays as memoryviews (or any other sequences); returns the
+    list of distances from the node w/ id 'source'. """
+    distances = [float("inf")] * (len(indptr) - 1)
+    distances[source] = 0.0
+    pq = [(0.0, source)]
+    heappush, heappop = heapq.heappush, heapq.heappop
+    while pq:
+        distance, current = heappop(pq)
+        if distance > distances[current]:
+            continue
+        for position in range(indptr[current], indptr[current + 1]):
+            neighbour = indices[position]
+            tentative_distance = distance + weights[position]
+            if tentative_distance < distances[neighbour]:
+                distances[neighbour] = tentative_distance
+                heappush(pq, (tentative_distance, neighbour))
+    return distances
+
+
+""" the worker side of CSRGraph.multi_source_shortest_paths(): the shared memory blocks each worker process attaches to
+once, when it starts, and the (indptr, indices, weights) memoryviews over them that every task's Dijkstra reads. """
+shared_blocks = None
+shared_views = None
+
+
+def attach_shared_graph(specs):
+    """ the pool's initializer. Each block is viewed as a flat memoryview of its array's element type, cut to the array's
+    length (a block may be rounded up to a whole number of pages). The blocks stay attached for the life of the worker, as
+    the views point into them. Nodes are referred to by their ids, so the names are never shipped to the workers. """
+    global shared_blocks, shared_views
+    blocks, views = [], []
+    for name, shape, dtype in specs:
+        block = shared_memory.SharedMemory(name=name)
+        dtype = np.dtype(dtype)
+        blocks.append(block)
+        views.append(block.buf[:int(np.prod(shape)) * dtype.itemsize].cast(dtype.char))
+    shared_blocks, shared_views = blocks, tuple(views)
+
+
+def shared_shortest_path(node_id):
+    return np.array(dijkstra(*shared_views, node_id))
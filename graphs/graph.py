@@ -1,11 +1,16 @@
+from time import perf_counter
 import heapq
-from collections import deque
+
+from shortest_path_cache import ShortestPathCache
 
 
 class Node:
     def __init__(self, name):
         self.__name = name
         self.edges = {}
+        """ the reverse of 'edges': maps each node w/ an edge to this one to that edge's weight. It lets delete_node() remove 
+        the edges pointing at a node, and lets shortest_path() search backwards from a target in a directed graph. """
+        self.incoming = {}
         
 
 class Graph:
@@ -14,20 +19,66 @@ class Graph:
     def __init__(self, directed):
         self.__nodes = {}
         self.__directed = directed
+        """ incremented by every change to the graph's nodes or edges. """
+        self.version = 0
+        self.cache = None
+
+    def enable_cache(self, max_sources=128, max_bytes=None):
+        """ start caching shortest_path() results, for up to 'max_sources' sources (and, if given, about 'max_bytes' bytes) 
+        at a time; see ShortestPathCache. Return the cache, whose snapshot() reports its hit rate and latencies. """
+        self.cache = ShortestPathCache(max_sources, max_bytes)
+        return self.cache
+
+    def disable_cache(self):
+        """ stop caching, discarding the cached results; return the cache. """
+        cache = self.cache
+        self.cache = None
+        if cache is not None:
+            cache.clear()
+        return cache
 
     def add_node(self, new_node):
         """ if the new node isn't yet in the AL, add the new node as a key in __nodes w/ an empty dictionary, 
         representing no outgoing edges from the new node. """
         if new_node not in self.__nodes:
             self.__nodes[new_node] = Node(new_node)
+            self.version += 1
+            if self.cache is not None:
+                self.cache.node_added(new_node)
         else:
             raise ValueError("Node already exists.")
 
     def delete_node(self, node_to_delete):
-        if node_to_delete in self.__nodes:
-            del self.__nodes[node_to_delete]
-        else:
+        """ remove the node along w/ every edge to and from it, so no other node is left w/ an edge to a missing node. """
+        if node_to_delete not in self.__nodes:
             raise ValueError("Node doesn't exist.")
+        node = self.__nodes[node_to_delete]
+        for origin in list(node.incoming):
+            self.__unlink(origin, node_to_delete)
+        for destination in list(node.edges):
+            self.__unlink(node_to_delete, destination)
+        del self.__nodes[node_to_delete]
+        self.version += 1
+        if self.cache is not None:
+            self.cache.node_deleted(node_to_delete)
+
+    """ every edge is recorded in its origin's 'edges' and its destination's 'incoming', and every change to one is 
+    reported to the cache (if enabled), so it can drop the results the change affects. """
+    def __link(self, origin, destination, weight):
+        if self.cache is not None:
+            self.cache.edge_changed(origin, destination, self.__nodes[origin].edges.get(destination), weight)
+        self.__nodes[origin].edges[destination] = weight
+        self.__nodes[destination].incoming[origin] = weight
+        self.version += 1
+
+    def __unlink(self, origin, destination):
+        if destination not in self.__nodes[origin].edges:
+            return
+        if self.cache is not None:
+            self.cache.edge_changed(origin, destination, self.__nodes[origin].edges[destination], None)
+        del self.__nodes[origin].edges[destination]
+        del self.__nodes[destination].incoming[origin]
+        self.version += 1
 
     def list_nodes(self):
         """ print all keys representing the nodes. """
@@ -41,19 +92,18 @@ class Graph:
             raise ValueError("Destination doesn't exist.")
         if not isinstance(weight, (int)):
             raise ValueError("Non-positive integer weight.")
-        self.__nodes[origin].edges[destination] = weight
+        self.__link(origin, destination, weight)
         if not self.__directed:
-            self.__nodes[destination].edges[origin] = weight
+            self.__link(destination, origin, weight)
 
     def delete_edge(self, origin, destination):
         if origin not in self.__nodes:
             raise ValueError("Origin doesn't exist.")
         if destination not in self.__nodes:
             raise ValueError("Destination doesn't exist.")
-        if destination in self.__nodes[origin].edges:
-            del self.__nodes[origin].edges[destination]
-        if not self.__directed and origin in self.__nodes[destination].edges:
-            del self.__nodes[destination].edges[origin]
+        self.__unlink(origin, destination)
+        if not self.__directed:
+            self.__unlink(destination, origin)
 
     def alter_edge(self, origin, destination, weight):
         """ check if both nodes exist, before checking if there's an edge between them and updating it. 
@@ -62,9 +112,9 @@ class Graph:
             raise ValueError("Origin doesn't exist.")
         if destination not in self.__nodes:
             raise ValueError("Destination doesn't exist.")
-        self.__nodes[origin].edges[destination] = weight
+        self.__link(origin, destination, weight)
         if not self.__directed:
-            self.__nodes[destination].edges[origin] = weight
+            self.__link(destination, origin, weight)
 
     def show_connection(self, origin, destination):
         if origin not in self.__nodes:
@@ -76,55 +126,138 @@ class Graph:
         else:
             raise ValueError("Edge does not exist.")
 
-    def depth_first_search(self, node, visited = None):
-        """ utilises recursive calls to traverse a graph from the current node, going as far down as possible before backtracking. 
-        The given node is added to 'visited'; if the neighbouring node hasn't been visited, pass it as an argument into the recursion. 
-        This continues until all nodes reachable from the starting node have been visited. """
+    def depth_first_traverse(self, node, details=False, visitor=None, visited=None):
+        """ a generator that traverses the graph from the given node, going as far down as possible before backtracking, and 
+        yields each node as it's first visited (or a (node, depth, parent) tuple if 'details' is True; the starting node has 
+        a depth of 0 and a parent of None). Rather than recursing once per node, which overflows the call stack on long 
+        chains, each node on the current path is kept on an explicit stack along w/ an iterator over its remaining edges, so 
+        nodes are visited in the same order as w/ recursion. Nothing is done ahead of what's been yielded, so stopping 
+        early (e.g. breaking out of a for loop) costs nothing; alternatively, the traversal stops after any node for which 
+        visitor(node, depth, parent) returns True. Nodes already in 'visited' are skipped, and it's updated in place. """
         if node not in self.__nodes:
             raise ValueError("Node doesn't exist.")
-        
+
         if visited is None:
             visited = set()
-        
-        visited.add(node)
-        result = str(node) + " "
-        
-        for neighbour in self.__nodes[node].edges:
-            if neighbour not in visited:
-                result += self.depth_first_search(neighbour, visited)
-        return result
-    
-    def breadth_first_search(self, node):
-        """ utilises a queue to explore nodes at the same depth before ascending. The given node is added to 
-        'queue' and 'visited', before a loop is entered until 'queue' is empty. In each iteration, dequeue the front node 
-        and explore its neighbours; for each, if it hasn't been visited, enqueue it to the back and add it to 'visited'. 
-        This continues until all nodes reachable from the starting node have been visited. """
-        if node not in self.__nodes:
-            raise ValueError("Node doesn't exist.")
 
-        """ 'deque' creates a double ended queue in which arguments can be appended or popped at either end. """
-        visited = set()
-        queue = deque([node])
         visited.add(node)
-        result = str(node) + " "
-        
-        while queue:
-            current_node = queue.popleft()
-            
-            for neighbour in self.__nodes[current_node].edges:
+        yield (node, 0, None) if details else node
+        if visitor is not None and visitor(node, 0, None):
+            return
+        stack = [(node, iter(self.__nodes[node].edges))]
+
+        while stack:
+            parent, neighbours = stack[-1]
+            for neighbour in neighbours:
                 if neighbour not in visited:
-                    queue.append(neighbour)
-                    visited.add(neighbour)
-                    result += str(neighbour) + " "
-                  
-        return result
+                    break
+            else:
+                stack.pop()
+                continue
+            visited.add(neighbour)
+            depth = len(stack)
+            yield (neighbour, depth, parent) if details else neighbour
+            if visitor is not None and visitor(neighbour, depth, parent):
+                return
+            stack.append((neighbour, iter(self.__nodes[neighbour].edges)))
 
-    def shortest_path(self, node):
+    def breadth_first_traverse(self, node, details=False, visitor=None):
+        """ a generator that traverses the graph from the given node, exploring every node at one depth before moving on to 
+        the next. Yields, early stopping and 'visitor' work as in depth_first_traverse(). Each node is marked as visited (and 
+        yielded) when it's discovered, so it's only ever explored once. """
         if node not in self.__nodes:
             raise ValueError("Node doesn't exist.")
 
+        visited = {node}
+        yield (node, 0, None) if details else node
+        if visitor is not None and visitor(node, 0, None):
+            return
+
+        """ explore one depth at a time: 'level' holds the nodes discovered at the current depth, in order, and their 
+        undiscovered neighbours make up the next level. This visits nodes in the same order as a single FIFO queue, 
+        w/o storing each node's depth alongside it. """
+        level = [node]
+        depth = 0
+        while level:
+            depth += 1
+            next_level = []
+            for current_node in level:
+                for neighbour in self.__nodes[current_node].edges:
+                    if neighbour not in visited:
+                        visited.add(neighbour)
+                        yield (neighbour, depth, current_node) if details else neighbour
+                        if visitor is not None and visitor(neighbour, depth, current_node):
+                            return
+                        next_level.append(neighbour)
+            level = next_level
+
+    def depth_first_search(self, node, visited = None):
+        """ return the nodes reachable from the given node, in depth-first order, as a space-separated string. The string is 
+        joined once from depth_first_traverse(), rather than concatenated node by node (which copies the string each time, 
+        taking quadratic time). """
+        return " ".join(map(str, self.depth_first_traverse(node, visited=visited))) + " "
+    
+    def breadth_first_search(self, node):
+        """ as depth_first_search(), in breadth-first order. """
+        return " ".join(map(str, self.breadth_first_traverse(node))) + " "
+
+    def shortest_path(self, source, target=None, heuristic=None, bidirectional=False, stats=None):
+        """ w/o a target, return a dictionary of the shortest distances from 'source' to every node (inf for unreachable 
+        ones). W/ a target, return a (distance, path) tuple, where 'path' lists the nodes from source to target (or is empty 
+        if the target is unreachable), using one of three searches that stop as soon as the target's distance is known:
+            by default, Dijkstra's algorithm, stopping once the target is settled;
+            w/ bidirectional=True, two Dijkstra searches, forwards from the source and backwards from the target;
+            w/ a heuristic, A*. heuristic(node, target) must never overestimate the distance from node to target, nor 
+            fall by more than an edge's weight along any edge (e.g. the straight-line distance, for nodes placed on a 
+            map); the closer it is to the true distance, the fewer nodes are settled.
+        If 'stats' is a dictionary, the number of nodes settled is stored in it under "settled".
+        W/ the cache enabled, every query is answered from the source's cached shortest-path tree, which is built (w/ a 
+        full Dijkstra, whatever the search asked for) and cached on a miss. """
+        if source not in self.__nodes:
+            raise ValueError("Node doesn't exist.")
+        if target is not None and target not in self.__nodes:
+            raise ValueError("Node doesn't exist.")
+        if heuristic is not None and bidirectional:
+            raise ValueError("A heuristic can't be combined w/ a bidirectional search.")
+        if self.cache is not None:
+            return self.__cached_shortest_path(source, target, stats)
+        if target is None:
+            return self.__distances_from(source)
+
+        if bidirectional:
+            distance, path, settled = self.__bidirectional_search(source, target)
+        else:
+            distance, path, settled = self.__search(source, target, heuristic)
+        if stats is not None:
+            stats["settled"] = settled
+        return distance, path
+
+    def __cached_shortest_path(self, source, target, stats):
+        start = perf_counter()
+        cached = self.cache.get(source)
+        if cached is None:
+            predecessors = {source: None}
+            distances = self.__distances_from(source, predecessors)
+            self.cache.put(source, distances, predecessors)
+        else:
+            distances, predecessors = cached
+        if stats is not None:
+            stats["settled"] = 0 if cached is not None else len(predecessors)
+
+        """ the cached dictionary is copied, as the caller may change it. """
+        if target is None:
+            result = dict(distances)
+        elif distances[target] == float('inf'):
+            result = (distances[target], [])
+        else:
+            result = (distances[target], self.__path(predecessors, target))
+        self.cache.record(cached is not None, perf_counter() - start)
+        return result
+
+    def __distances_from(self, node, predecessors=None):
         """ tracks the tentative distances from the starting node to each node in the graph; set the distance to the starting node 
-        as 0 and all other distances as infinite. """
+        as 0 and all other distances as infinite. If 'predecessors' is given, each node's predecessor on its shortest path is 
+        recorded in it. """
         distances = {n: float('inf') for n in self.__nodes}
         distances[node] = 0
         """ represents a heap-based priority queue, used to store nodes in order of their TDs. """
@@ -145,6 +278,112 @@ class Graph:
                 tentative_distance = dist + weight
                 if tentative_distance < distances[neighbour]:
                     distances[neighbour] = tentative_distance
+                    if predecessors is not None:
+                        predecessors[neighbour] = current_node
                     """ 'heapq.heappush' inserts an element into the heap whilst preserving OPs. """
                     heapq.heappush(pq, (tentative_distance, neighbour))
         return distances
+
+    @staticmethod
+    def __path(predecessors, node):
+        """ follow 'predecessors' back from 'node' to the start of the search, returning the nodes in order from the 
+        start. """
+        path = []
+        while node is not None:
+            path.append(node)
+            node = predecessors[node]
+        path.reverse()
+        return path
+
+    def __search(self, source, target, heuristic=None):
+        """ Dijkstra's algorithm (or A*, w/ a heuristic) from source, until target is settled. Unlike __distances_from(), 
+        only the nodes reached so far have an entry in 'distances', so nothing is done per node of the graph up front. With 
+        a heuristic, nodes are settled in order of distance + heuristic(node, target), so nodes leading away from the target 
+        are put off. """
+        distances = {source: 0}
+        predecessors = {source: None}
+        settled = set()
+        pq = [(0 if heuristic is None else heuristic(source, target), source)]
+
+        while pq:
+            _, current_node = heapq.heappop(pq)
+            if current_node in settled:
+                continue
+            settled.add(current_node)
+            if current_node == target:
+                return distances[target], self.__path(predecessors, target), len(settled)
+
+            dist = distances[current_node]
+            for neighbour, weight in self.__nodes[current_node].edges.items():
+                tentative_distance = dist + weight
+                if tentative_distance < distances.get(neighbour, float('inf')):
+                    distances[neighbour] = tentative_distance
+                    predecessors[neighbour] = current_node
+                    priority = tentative_distance if heuristic is None else tentative_distance + heuristic(neighbour, target)
+                    heapq.heappush(pq, (priority, neighbour))
+        return float('inf'), [], len(settled)
+
+    def __bidirectional_search(self, source, target):
+        """ alternate between a forward Dijkstra search from the source (along 'edges') and a backward one from the target 
+        (along 'incoming'), always advancing the one whose next node is closer. 'best' is the shortest source-target 
+        distance found so far through a node reached by both. Once the two searches' next distances add up to at least 
+        'best', no shorter path can remain, so each search only covers about half the distance, which on large sparse 
+        graphs settles far fewer nodes than one search covering all of it. """
+        searches = [
+            ({source: 0}, {source: None}, set(), [(0, source)], "edges"),
+            ({target: 0}, {target: None}, set(), [(0, target)], "incoming"),
+        ]
+        best, meeting_node = (0, source) if source == target else (float('inf'), None)
+
+        while searches[0][3] and searches[1][3]:
+            if searches[0][3][0][0] + searches[1][3][0][0] >= best:
+                break
+            direction = 0 if searches[0][3][0][0] <= searches[1][3][0][0] else 1
+            distances, predecessors, settled, pq, adjacency = searches[direction]
+            other_distances = searches[1 - direction][0]
+
+            dist, current_node = heapq.heappop(pq)
+            if current_node in settled:
+                continue
+            settled.add(current_node)
+
+            for neighbour, weight in getattr(self.__nodes[current_node], adjacency).items():
+                tentative_distance = dist + weight
+                if tentative_distance < distances.get(neighbour, float('inf')):
+                    distances[neighbour] = tentative_distance
+                    predecessors[neighbour] = current_node
+                    heapq.heappush(pq, (tentative_distance, neighbour))
+                if neighbour in other_distances and distances[neighbour] + other_distances[neighbour] < best:
+                    best = distances[neighbour] + other_distances[neighbour]
+                    meeting_node = neighbour
+
+        num_settled = len(searches[0][2]) + len(searches[1][2])
+        if meeting_node is None:
+            return float('inf'), [], num_settled
+        """ the forward half runs from the source to the meeting node; the backward predecessors lead from there on to the 
+        target. """
+        path = self.__path(searches[0][1], meeting_node)
+        path.extend(reversed(self.__path(searches[1][1], meeting_node)[:-1]))
+        return best, path, num_settled
+
+    def freeze(self):
+        """ return an immutable CSRGraph snapshot of the graph, for fast read-only analytics; later changes to the graph
+        aren't reflected in it. csr_graph is imported here, so NumPy is only needed by code that freezes graphs. """
+        from csr_graph import CSRGraph
+        return CSRGraph.from_adjacency({name: node.edges for name, node in self.__nodes.items()}, self.__directed)
+
+    def multi_source_shortest_paths(self, sources, workers=None, context=None):
+        """ a generator yielding a (source, distances) pair for each of 'sources', computed in parallel by
+        CSRGraph.multi_source_shortest_paths() on a frozen snapshot of the graph; see there. As w/ shortest_path(), 'distances'
+        is a dictionary from node to distance (inf for unreachable nodes), rebuilt from the snapshot's id-indexed array as
+        each result arrives; this costs a few percent of the search. Callers wanting the arrays should freeze() the graph and
+        use the snapshot directly, whose 'names' maps ids back to nodes. """
+        frozen = self.freeze()
+        results = frozen.multi_source_shortest_paths(sources, workers, context)
+        try:
+            for source, distances in results:
+                yield source, dict(zip(frozen.names, distances.tolist()))
+        finally:
+            """ stopping early must close the snapshot's generator straight away, so that it cancels its tasks and frees the
+            shared memory. """
+            results.close()
@@ -0,0 +1,35 @@
+""" compare CSRGraph.multi_source_shortest_paths() against calling shortest_path() once per source, run w/
+`python multi_source_benchmarks.py [num_nodes] [num_sources]`, on a sparse directed graph of num_nodes nodes, each w/ 4
+edges to random nodes. Reports the throughput (sources per second) for 1, 2, 4, ... workers, up to os.cpu_count(). """
+from random import Random
+from time import perf_counter
+import os
+import sys
+
+from shortest_path_benchmarks import random_graph
+
+
+def benchmark(num_nodes=100000, num_sources=64):
+    rng = Random(0)
+    frozen = random_graph(num_nodes, rng).freeze()
+    sources = [rng.randrange(num_nodes) for _ in range(num_sources)]
+
+    start = perf_counter()
+    for source in sources:
+        frozen.shortest_path(source)
+    sequential = num_sources / (perf_counter() - start)
+    print(f"{'workers':<12}{'sources/s':>10}{'speedup':>9}")
+    print(f"{'sequential':<12}{sequential:>10.2f}{1:>9.2f}")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = perf_counter()
+        for _ in frozen.multi_source_shortest_paths(sources, workers):
+            pass
+        throughput = num_sources / (perf_counter() - start)
+        print(f"{workers:<12}{throughput:>10.2f}{throughput / sequential:>9.2f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    benchmark(*(int(arg) for arg in sys.argv[1:3]))
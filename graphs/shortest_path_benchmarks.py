@@ -0,0 +1,82 @@
+""" compare Graph.shortest_path()'s point-to-point searches, run w/ `python shortest_path_benchmarks.py [num_nodes]`:
+    random: a sparse directed graph of num_nodes nodes, each w/ 4 edges to random nodes (random_graph(), which the other
+            graph benchmarks share).
+    grid:   a square undirected grid of about num_nodes nodes, each joined to its 4 neighbours; the only graph here w/ a
+            meaningful heuristic (the Manhattan distance times the smallest weight), so A* is only run on it.
+Each search is run between the same 50 random source/target pairs and reported as the mean number of nodes settled and
+the mean time per query, alongside the full single-source Dijkstra (shortest_path() w/o a target) it replaces. """
+from random import Random
+from time import perf_counter
+import sys
+
+from graph import Graph
+
+
+def random_graph(num_nodes, rng, degree=4):
+    graph = Graph(directed=True)
+    for node in range(num_nodes):
+        graph.add_node(node)
+    for node in range(num_nodes):
+        for _ in range(degree):
+            graph.add_edge(node, rng.randrange(num_nodes), rng.randint(1, 100))
+    return graph
+
+def grid_graph(num_nodes, rng):
+    """ nodes are (row, column) tuples; every weight is at least 1, so the Manhattan distance never overestimates. """
+    side = max(int(num_nodes ** 0.5), 2)
+    graph = Graph(directed=False)
+    for row in range(side):
+        for column in range(side):
+            graph.add_node((row, column))
+    for row in range(side):
+        for column in range(side):
+            if row + 1 < side:
+                graph.add_edge((row, column), (row + 1, column), rng.randint(1, 10))
+            if column + 1 < side:
+                graph.add_edge((row, column), (row, column + 1), rng.randint(1, 10))
+
+    def manhattan(node, target):
+        return abs(node[0] - target[0]) + abs(node[1] - target[1])
+    return graph, [(row, column) for row in range(side) for column in range(side)], manhattan
+
+""" each maps (num_nodes, rng) to a (graph, list of its nodes, heuristic or None) tuple. """
+GRAPHS = {
+    "random": lambda num_nodes, rng: (random_graph(num_nodes, rng), list(range(num_nodes)), None),
+    "grid": grid_graph,
+}
+
+
+def run(graph, pairs, **kwargs):
+    settled = 0
+    stats = {}
+    start = perf_counter()
+    for source, target in pairs:
+        graph.shortest_path(source, target, stats=stats, **kwargs)
+        settled += stats["settled"]
+    return settled / len(pairs), (perf_counter() - start) / len(pairs)
+
+def run_full(graph, pairs):
+    start = perf_counter()
+    for source, _ in pairs:
+        graph.shortest_path(source)
+    return perf_counter() - start
+
+def benchmark(num_nodes=100000, num_queries=50):
+    print(f"{'graph':<8}{'search':<15}{'settled':>10}{'ms/query':>10}")
+    for graph_name, make_graph in GRAPHS.items():
+        rng = Random(0)
+        graph, nodes, heuristic = make_graph(num_nodes, rng)
+        pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(num_queries)]
+
+        full_time = run_full(graph, pairs[:5]) / 5
+        print(f"{graph_name:<8}{'full':<15}{len(nodes):>10}{full_time * 1e3:>10.2f}")
+        searches = {"dijkstra": {}, "bidirectional": {"bidirectional": True}}
+        if heuristic is not None:
+            searches["a*"] = {"heuristic": heuristic}
+        for search, kwargs in searches.items():
+            settled, query_time = run(graph, pairs, **kwargs)
+            print(f"{graph_name:<8}{search:<15}{settled:>10.0f}{query_time * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
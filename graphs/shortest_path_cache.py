@@ -0,0 +1,117 @@
+from collections import OrderedDict
+import sys
+
+
+class ShortestPathCache:
+    """ a cache of Graph.shortest_path() results, enabled by Graph.enable_cache(). For each cached source, it holds the
+    distances to every node along w/ the shortest-path tree they came from (each node's predecessor on its shortest path),
+    so it also answers point-to-point queries from that source. Sources are evicted least recently used first, once
+    there are more than 'max_sources' of them, or once their estimated size exceeds 'max_bytes' (if given).
+
+    Graph's mutators report each change, and only the sources whose results it can alter are dropped:
+        a new edge (or a lower weight) from u to v only matters if it gives v a shorter distance than it has;
+        removing an edge (or raising its weight) only matters if it's in the tree, i.e. u is v's predecessor;
+        a new node is just added to each result as unreachable.
+    snapshot() returns the hit rate, latencies, and the number of sources invalidated and evicted. """
+    def __init__(self, max_sources=128, max_bytes=None):
+        self.max_sources = max_sources
+        self.max_bytes = max_bytes
+        """ maps each source to a (distances, predecessors, estimated size in bytes) tuple, least recently used first. """
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+        self.hit_time = 0.0
+        self.miss_time = 0.0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def __contains__(self, source):
+        return source in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, source):
+        """ return the cached (distances, predecessors) for 'source', marking it as the most recently used, or None. """
+        entry = self.entries.get(source)
+        if entry is None:
+            return None
+        self.entries.move_to_end(source)
+        return entry[:2]
+
+    def put(self, source, distances, predecessors):
+        """ the size is estimated from the two dictionaries' hash tables; the node names and distances themselves are
+        shared w/ the graph, or are small numbers. """
+        self.discard(source)
+        nbytes = sys.getsizeof(distances) + sys.getsizeof(predecessors)
+        self.entries[source] = (distances, predecessors, nbytes)
+        self.nbytes += nbytes
+        while self.entries and (len(self.entries) > self.max_sources or
+                                (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            self.nbytes -= self.entries.popitem(last=False)[1][2]
+            self.evictions += 1
+
+    def discard(self, source):
+        entry = self.entries.pop(source, None)
+        if entry is not None:
+            self.nbytes -= entry[2]
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def record(self, hit, seconds):
+        if hit:
+            self.hits += 1
+            self.hit_time += seconds
+        else:
+            self.misses += 1
+            self.miss_time += seconds
+
+    """ the Graph's mutators call these for every change, after validating it but before making it. 'old' and 'new' are the
+    edge's weights before and after (None where there's no edge), and an undirected edge is reported once per direction. """
+    def edge_changed(self, origin, destination, old, new):
+        if old == new:
+            return
+        stale = []
+        for source, (distances, predecessors, _) in self.entries.items():
+            if old is not None and (new is None or new > old):
+                if predecessors.get(destination) == origin:
+                    stale.append(source)
+            elif distances[origin] + new < distances[destination]:
+                stale.append(source)
+        for source in stale:
+            self.discard(source)
+        self.invalidations += len(stale)
+
+    def node_added(self, node):
+        for distances, _, _ in self.entries.values():
+            distances[node] = float('inf')
+
+    def node_deleted(self, node):
+        """ called once the node's edges have been removed, which has already dropped every source that reached it through
+        them; so, other than the node's own entry, it's only unreachable in those left. """
+        if node in self.entries:
+            self.discard(node)
+            self.invalidations += 1
+        for distances, predecessors, _ in self.entries.values():
+            del distances[node]
+            predecessors.pop(node, None)
+
+    def snapshot(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "mean_hit_us": self.hit_time / self.hits * 1e6 if self.hits else 0.0,
+            "mean_miss_us": self.miss_time / self.misses * 1e6 if self.misses else 0.0,
+            "sources": len(self.entries),
+            "nbytes": self.nbytes,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,50 @@
+""" measure Graph's shortest-path cache, run w/ `python shortest_path_cache_benchmarks.py [num_nodes] [num_queries]`, on a
+sparse directed graph of num_nodes nodes, each w/ 4 edges to random nodes. Queries come from 8 hot sources (and, one time
+in 10, a random cold one), and one query in 20 is preceded by a random edge change (a new edge, a raised weight or a
+removed edge), which the cache must invalidate selectively. Reports the same trace w/o and w/ the cache. """
+from random import Random
+from time import perf_counter
+import sys
+
+from shortest_path_benchmarks import random_graph
+
+
+def make_trace(num_nodes, num_queries, rng):
+    """ a list of ("query", source) and ("add"/"raise"/"delete", origin, destination, weight) operations. """
+    hot = [rng.randrange(num_nodes) for _ in range(8)]
+    trace = []
+    for _ in range(num_queries):
+        if rng.random() < 0.05:
+            trace.append((rng.choice(("add", "raise", "delete")), rng.randrange(num_nodes), rng.randrange(num_nodes),
+                          rng.randint(1, 100)))
+        trace.append(("query", rng.randrange(num_nodes) if rng.random() < 0.1 else rng.choice(hot)))
+    return trace
+
+def run(graph, trace):
+    start = perf_counter()
+    for operation, *args in trace:
+        if operation == "query":
+            graph.shortest_path(args[0])
+        elif operation == "add":
+            graph.add_edge(*args)
+        elif operation == "raise":
+            graph.alter_edge(*args)
+        else:
+            graph.delete_edge(*args[:2])
+    return perf_counter() - start
+
+def benchmark(num_nodes=100000, num_queries=200):
+    trace = make_trace(num_nodes, num_queries, Random(1))
+    uncached = run(random_graph(num_nodes, Random(0)), trace)
+    print(f"uncached: {uncached:.2f}s ({uncached / num_queries * 1e3:.2f}ms/query)")
+
+    graph = random_graph(num_nodes, Random(0))
+    cache = graph.enable_cache(max_sources=16)
+    cached = run(graph, trace)
+    print(f"cached:   {cached:.2f}s ({cached / num_queries * 1e3:.2f}ms/query)")
+    for key, value in cache.snapshot().items():
+        print(f"    {key}: {value:.3f}" if isinstance(value, float) else f"    {key}: {value}")
+
+
+if __name__ == "__main__":
+    benchmark(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,102 @@
+""" a concurrent hash table splits the key space into independently locked segments, each of which is an ordinary HashTable
+w/ its own buckets, load factor and resizing. A key's segment is chosen from the same MurmurHash3 value HashTable indexes with,
+so threads working on keys in different segments never contend, rather than all serialising on one global lock. Each key is 
+hashed once: the hash that picks the segment is passed on to the segment's HashTable, rather than recomputed there. """
+from functools import lru_cache
+import threading
+
+from mmh3 import hash
+
+from hash_table import HashTable
+
+
+""" distinguishes a missing key from one whose value is None, and 'no default given' from a default of None in 'pop()'. """
+_MISSING = object()
+
+
+class ConcurrentHashTable:
+    def __init__(self, size, num_segments=16, hash_cache_size=0, **kwargs):
+        """ the initial capacity is shared between the segments; any further keyword arguments (e.g. 'incremental') configure
+        every segment's HashTable. The segments never hash a key themselves, so 'hash_cache_size' memoises this table's hashes
+        instead, in one typed LRU cache shared by all segments (functools.lru_cache() is safe to call from several threads). """
+        self.num_segments = num_segments
+        segment_size = max(size // num_segments, 1)
+        self.segments = [HashTable(segment_size, **kwargs) for _ in range(num_segments)]
+        self.locks = [threading.Lock() for _ in range(num_segments)]
+        if hash_cache_size:
+            self.__get_hash = lru_cache(maxsize=hash_cache_size, typed=True)(self.__get_hash)
+
+    """ the same unsigned 32-bit MurmurHash3 of 'str(key)' that HashTable indexes with. """
+    @staticmethod
+    def __get_hash(key):
+        return hash(str(key), signed=False)
+
+    """ hash the key, and select a segment from the high bits of the hash (a multiply-shift range reduction). HashTable reduces 
+    the same hash modulo its size, which depends mostly on the low bits, so the keys of one segment still spread evenly over that 
+    segment's buckets. Returns the segment, its lock and the hash, which is handed on to the segment. """
+    def __segment(self, key):
+        hash_value = self.__get_hash(key)
+        index = (hash_value * self.num_segments) >> 32
+        return self.segments[index], self.locks[index], hash_value
+
+    @property
+    def num_elements(self):
+        return sum(segment.num_elements for segment in self.segments)
+
+    def add_item(self, key, value):
+        segment, lock, hash_value = self.__segment(key)
+        with lock:
+            segment.add_item(key, value, hash_value)
+
+    def get_item(self, key):
+        segment, lock, hash_value = self.__segment(key)
+        with lock:
+            return segment.get_item(key, hash_value)
+
+    def delete_item(self, key):
+        segment, lock, hash_value = self.__segment(key)
+        with lock:
+            segment.delete_item(key, hash_value)
+
+    """ atomically return the value for 'key', first adding 'value' under it if the key doesn't exist. """
+    def get_or_add(self, key, value):
+        segment, lock, hash_value = self.__segment(key)
+        with lock:
+            existing = segment.get(key, _MISSING, hash_value)
+            if existing is not _MISSING:
+                return existing
+            segment.add_item(key, value, hash_value)
+            return value
+
+    """ atomically return the value for 'key', first adding 'function(key)' under it if the key doesn't exist. 'function' runs
+    while the key's segment is locked, so it's called at most once per key, but it mustn't access this table itself. """
+    def compute_if_absent(self, key, function):
+        segment, lock, hash_value = self.__segment(key)
+        with lock:
+            existing = segment.get(key, _MISSING, hash_value)
+            if existing is not _MISSING:
+                return existing
+            value = function(key)
+            segment.add_item(key, value, hash_value)
+            return value
+
+    """ atomically remove 'key' and return its value. If the key doesn't exist, return 'default' if one was given, else raise a
+    KeyError. """
+    def pop(self, key, default=_MISSING):
+        segment, lock, hash_value = self.__segment(key)
+        with lock:
+            value = segment.get(key, _MISSING, hash_value)
+            if value is _MISSING:
+                if default is _MISSING:
+                    raise KeyError("Key doesn't exist.")
+                return default
+            segment.delete_item(key, hash_value)
+            return value
+
+    """ each segment is locked in turn, so the result is consistent per segment, but not a snapshot of the whole table. """
+    def key_contains(self, substring):
+        matching_data = []
+        for segment, lock in zip(self.segments, self.locks):
+            with lock:
+                matching_data.extend(segment.key_contains(substring))
+        return matching_data
@@ -0,0 +1,84 @@
+""" compare ConcurrentHashTable against a HashTable behind one global lock, run w/
+`python concurrent_hash_table_benchmarks.py [num_operations]`:
+    read-heavy:  95% get_item() and 5% add_item() calls on random keys of a pre-filled table.
+    write-heavy: 50% get_item() and 50% add_item() calls, on the same keys.
+Each workload is split evenly between 1, 2, 4 and 8 threads, and reported in operations per second, as the best of 3 runs.
+Under the GIL, only one thread runs Python code at a time, so striping can't add parallelism here; what it shows is the
+overhead of the per-segment locks and whether threads queue up behind one lock (on a free-threaded build, the striped
+table is the one that can scale). """
+from random import Random
+from time import perf_counter
+import sys
+import threading
+
+from concurrent_hash_table import ConcurrentHashTable
+from hash_table import HashTable
+
+
+NUM_KEYS = 100000
+
+
+class GloballyLockedHashTable:
+    """ the baseline: every operation serialises on a single lock. """
+    def __init__(self, size):
+        self.table = HashTable(size)
+        self.lock = threading.Lock()
+
+    def add_item(self, key, value):
+        with self.lock:
+            self.table.add_item(key, value)
+
+    def get_item(self, key):
+        with self.lock:
+            return self.table.get_item(key)
+
+
+TABLES = {
+    "striped": lambda: ConcurrentHashTable(2 * NUM_KEYS),
+    "global lock": lambda: GloballyLockedHashTable(2 * NUM_KEYS),
+}
+
+
+def make_operations(num_operations, write_ratio, rng):
+    """ a list of (is_write, key) pairs. """
+    return [(rng.random() < write_ratio, rng.randrange(NUM_KEYS)) for _ in range(num_operations)]
+
+def worker(table, operations, barrier):
+    add_item = table.add_item
+    get_item = table.get_item
+    barrier.wait()
+    for is_write, key in operations:
+        if is_write:
+            add_item(key, key)
+        else:
+            get_item(key)
+
+def throughput(factory, operations, num_threads):
+    table = factory()
+    for key in range(NUM_KEYS):
+        table.add_item(key, key)
+    barrier = threading.Barrier(num_threads + 1)
+    threads = [threading.Thread(target=worker, args=(table, operations[index::num_threads], barrier))
+               for index in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = perf_counter()
+    for thread in threads:
+        thread.join()
+    return len(operations) / (perf_counter() - start)
+
+def benchmark(num_operations=200000):
+    rng = Random(0)
+    for workload, write_ratio in (("read-heavy", 0.05), ("write-heavy", 0.5)):
+        operations = make_operations(num_operations, write_ratio, rng)
+        print(f"{workload:<14}{'threads':>8}{'ops/s':>12}")
+        for num_threads in (1, 2, 4, 8):
+            for name, factory in TABLES.items():
+                rate = max(throughput(factory, operations, num_threads) for _ in range(3))
+                print(f"{name:<14}{num_threads:>8}{rate:>12,.0f}")
+        print()
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -2,98 +2,485 @@
 accessible by removing the requirement for all records to be checked. Indexes are created via the application of hashing algorithms 
 to the value in each record's key field. These are bound to produce synonyms (hashes to identical memory addresses), with two 
 record keys hashing to the same address being a 'collision.' """
+from functools import lru_cache
+import csv
+import gc
+import json
+
 from tabulate import tabulate
 from mmh3 import hash
 
 
+""" the number of old buckets migrated by each operation during an incremental resize. Since a resize is triggered at a load factor 
+of 0.75 and the next one at 1.5 times as many elements, any step >= 2 guarantees a migration finishes before another is needed. """
+REHASH_STEP = 4
+
+
 class HashTable:
-    def __init__(self, size):
+    def __init__(self, size, incremental=False, hash_cache_size=0, substring_index=False):
         self.num_elements = 0
         self.data = [None] * size
         self.size = size
+        """ every resize multiplies the size by a power of two, so the size is always 'base_size * 2**k'; 'scan()' relies on this 
+        to keep its cursors valid across resizes. """
+        self.base_size = size
+        """ when 'incremental' is True, a resize allocates the doubled bucket array but leaves the entries in 'old_data', moving 
+        REHASH_STEP buckets across on each subsequent operation; this spreads the cost of a rehash over many calls rather than 
+        stalling whichever 'add_item()' crosses the threshold. 'rehash_index' is the next old bucket to be migrated. """
+        self.incremental = incremental
+        self.old_data = None
+        self.old_size = 0
+        self.rehash_index = 0
+        """ a non-zero 'hash_cache_size' memoises the hashes of the most recently used keys in a bounded LRU cache, which pays off 
+        for hot keys whose 'str()' is expensive to build (e.g. tuples or large integers). functools.lru_cache() is created per 
+        instance, so that tables don't evict each other's keys. The cache is typed: equal keys of different types (e.g. 1, True 
+        and 1.0) have different 'str()'s, and so different hashes, which they mustn't share. Only the key's own type is checked, 
+        so equal containers of differently typed elements (e.g. (1,) and (1.0,)) should still be avoided as keys. """
+        if hash_cache_size:
+            self.__get_hash = lru_cache(maxsize=hash_cache_size, typed=True)(self.__get_hash)
+        """ when 'substring_index' is True, 'trigram_index' maps every 3-character substring of each 'str(key)' (prefixed w/ a NUL 
+        anchor, so prefixes get trigrams of their own) to the set of keys containing it. 'key_contains()' and 'key_startswith()' 
+        then only check the keys sharing every trigram of the query, rather than scanning the whole HT. """
+        self.trigram_index = {} if substring_index else None
       
-    """ calculate the hash index for a given key via the non-cryptographic MurmurHash3 algorithm. 'mh3.hash()' takes a 'key' argument 
-    of a string, integer or byte array to be hashed, and returns a 32-bit, unsigned integer hash value, which is also deterministic. """
-    def __get_hash_index(self, key):
-        hash_value = hash(str(key))
-        return hash_value % self.size
+    """ calculate the hash for a given key via the non-cryptographic MurmurHash3 algorithm. 'mh3.hash()' takes a 'key' argument of 
+    a string, integer or byte array to be hashed, and returns a 32-bit, unsigned integer hash value, which is also deterministic. 
+    The full hash (not just the index) is stored beside each entry as a (hash, value) pair, so resizing reduces the cached hash 
+    against the new size instead of re-stringifying and rehashing every key. """
+    @staticmethod
+    def __get_hash(key):
+        return hash(str(key), signed=False)
+
+    """ locate the bucket currently holding a key. While an incremental resize is in progress, the key is either still in its 
+    (unmigrated) old bucket or already in the new one, so the old bucket is checked first. Returns the bucket dictionary, or None. """
+    def __find_bucket(self, key, hash_value):
+        if self.old_data is not None:
+            old_entry = self.old_data[hash_value % self.old_size]
+            if old_entry and key in old_entry:
+                return old_entry
+        entry = self.data[hash_value % self.size]
+        if entry and key in entry:
+            return entry
+        return None
       
     """ add a key-value pair to the HT, first calculating the hash index for the given key. If the HI in '__data' is None, initialise 
-    it as an empty dictionary, then add the KV pair to the dictionary at the HI and increment '__num_elements'. If the load factor 
-    (ratio of elements to the HT size) exceeds 0.75, trigger a resize operation. """
-    def add_item(self, key, value):
-        hash_index = self.__get_hash_index(key)
+    it as an empty dictionary, then add the KV pair to the dictionary at the HI and increment '__num_elements' (only for new keys; 
+    overwriting a value leaves the count unchanged). If the load factor (ratio of elements to the HT size) exceeds 0.75, trigger 
+    a resize operation. 
+
+    This method, 'get_item()', 'get()' and 'delete_item()' accept the key's 'hash_value' when the caller has already computed 
+    it (as ConcurrentHashTable does, to pick the key's segment), so the key isn't stringified and hashed a second time. It must 
+    be the key's unsigned 32-bit MurmurHash3 of 'str(key)', as '__get_hash()' returns. """
+    def add_item(self, key, value, hash_value=None):
+        if self.old_data is not None:
+            self.__rehash_step()
+        if hash_value is None:
+            hash_value = self.__get_hash(key)
+        existing_entry = self.__find_bucket(key, hash_value)
+        if existing_entry is not None:
+            existing_entry[key] = (hash_value, value)
+            return
+        hash_index = hash_value % self.size
         if self.data[hash_index] is None:
             self.data[hash_index] = {}
-        self.data[hash_index][key] = value
+        self.data[hash_index][key] = (hash_value, value)
         self.num_elements += 1
+        if self.trigram_index is not None:
+            self.__index_key(key)
         load_factor = self.num_elements / self.size
         if load_factor > 0.75:
             self.__resize_hash_table()
 
-    """ if the load factor exceeds the threshold, create 'new data' double the size of the current HT and initialise it with 'None' 
-    values. Then, iterate over each entry in the current hash table ('__data') and rehashe each KV pair to the new HT. Finally, update 
-    '__data' and '__size' to reflect the resized HT. """
-    def __resize_hash_table(self):
-        new_size = 2 * self.size
-        new_data = [None] * new_size
+    """ if the load factor exceeds the threshold, create 'new data' double the size of the current HT (or 'new_size', when presizing 
+    for a batch) and initialise it with 'None' values. In the default mode, iterate over each entry in the current hash table ('__data') and rehash each KV pair to the new HT 
+    straight away. In incremental mode, keep the current buckets as 'old_data' and let '__rehash_step()' drain them. """
+    def __resize_hash_table(self, new_size=None, incremental=None):
+        if self.old_data is not None:
+            """ a previous incremental resize is still draining; finish it before starting another. """
+            self.__rehash_step(self.old_size)
 
-        for entry in self.data:
+        self.old_data = self.data
+        self.old_size = self.size
+        self.rehash_index = 0
+        self.size = new_size or 2 * self.size
+        self.data = [None] * self.size
+
+        if not (self.incremental if incremental is None else incremental):
+            self.__rehash_step(self.old_size)
+
+    """ grow the HT so that 'num_elements' more entries fit without exceeding a load factor of 0.75, via a single resize straight to 
+    the final size. Any incremental resize still in progress is completed first, so that batch operations only deal w/ '__data'. """
+    def __reserve(self, num_elements):
+        if self.old_data is not None:
+            self.__rehash_step(self.old_size)
+        new_size = self.size
+        while (self.num_elements + num_elements) / new_size > 0.75:
+            new_size *= 2
+        if new_size != self.size:
+            self.__resize_hash_table(new_size, incremental=False)
+
+    """ migrate up to 'num_buckets' old buckets into the new bucket array, continuing from 'rehash_index', reusing each entry's 
+    cached hash. Once every old bucket has been moved, drop 'old_data' so that operations return to the single-array fast path. """
+    def __rehash_step(self, num_buckets=REHASH_STEP):
+        old_data = self.old_data
+        new_data = self.data
+        new_size = self.size
+        stop_index = min(self.rehash_index + num_buckets, self.old_size)
+
+        for old_index in range(self.rehash_index, stop_index):
+            entry = old_data[old_index]
             if entry:
-                for key, value in entry.items():
-                    new_hash_index = self.__get_hash_index(key)
-                    if new_data[new_hash_index] is None:
-                        new_data[new_hash_index] = {}
-                    new_data[new_hash_index][key] = value
-
-        self.data = new_data
-        self.size = new_size
-
-    """ search for an entry w/ the given key in the HT, calculating the HI for it via '__getHashIndex().' Then checks if the entry 
-    at that index is None and if it's not, it retrieve and return the value associated w/ the key from the dictionary at the HI. 
-    If the entry is 'None', it indicates that the key doesn't exist in the HT. """
-    def __find_entry(self, key):
-        hash_index = self.__get_hash_index(key)
-        if self.data[hash_index] is None:
+                for key, hashed_value in entry.items():
+                    new_hash_index = hashed_value[0] % new_size
+                    new_entry = new_data[new_hash_index]
+                    if new_entry is None:
+                        new_data[new_hash_index] = {key: hashed_value}
+                    else:
+                        new_entry[key] = hashed_value
+                old_data[old_index] = None
+
+        self.rehash_index = stop_index
+        if stop_index == self.old_size:
+            self.old_data = None
+            self.old_size = 0
+
+    """ search for an entry w/ the given key in the HT via '__find_bucket()', and retrieve the value associated w/ the key from the 
+    dictionary holding it. If there is no such dictionary, the key doesn't exist in the HT. """
+    def __find_entry(self, key, hash_value=None):
+        if self.old_data is not None:
+            self.__rehash_step()
+        entry = self.__find_bucket(key, self.__get_hash(key) if hash_value is None else hash_value)
+        if entry is None:
             return
-        return self.data[hash_index].get(key)
+        return entry[key][1]
 
     """ retrieve the value associated w/ a given key from the HT by calling '__findEntry()' to check if the key exists in the HT. 
     If so, return the corresponding value. """
-    def get_item(self, key):
-        entry = self.__find_entry(key)
+    def get_item(self, key, hash_value=None):
+        entry = self.__find_entry(key, hash_value)
         if entry is not None:
             return entry
         raise KeyError("Key doesn't exist.")
 
-    """ removs a KV pair from the HT by first calculating the key's HI via '__getHashIndex().' It then checks if the entry at the 
-    HI is 'None' or if the key isn't present in the dictionary at the HI; if either condition is true, raise a KeyError. Otherwise, 
-    delete the KV pair from the dictionary, decrement '__num_elements', and delete the KV pair from the HT. """
-    def delete_item(self, key):
-        hash_index = self.__get_hash_index(key)
-        if self.data[hash_index] is None or key not in self.data[hash_index]:
+    """ return the value associated w/ a given key, or 'default' if the key doesn't exist. Unlike 'get_item()', the key's presence 
+    is checked via '__find_bucket()' rather than inferred from the value, so a key stored w/ a value of None is told apart from a 
+    missing one. """
+    def get(self, key, default=None, hash_value=None):
+        if self.old_data is not None:
+            self.__rehash_step()
+        entry = self.__find_bucket(key, self.__get_hash(key) if hash_value is None else hash_value)
+        if entry is None:
+            return default
+        return entry[key][1]
+
+    """ removs a KV pair from the HT by first locating the dictionary holding the key via '__find_bucket().' If there is none, 
+    raise a KeyError. Otherwise, delete the KV pair from the dictionary and decrement '__num_elements'. """
+    def delete_item(self, key, hash_value=None):
+        if self.old_data is not None:
+            self.__rehash_step()
+        entry = self.__find_bucket(key, self.__get_hash(key) if hash_value is None else hash_value)
+        if entry is None:
             raise KeyError("Key doesn't exist.")
 
-        del self.data[hash_index][key]
+        del entry[key]
         self.num_elements -= 1
+        if self.trigram_index is not None:
+            self.__unindex_key(key)
+
+    """ add every KV pair from an iterable of (key, value) pairs. The HT is presized once from the batch length (or 'size_hint', 
+    for iterables without a length), and the whole batch is hashed in one pass before any insertion, so no resize happens part-way 
+    through. A later pair overwrites an earlier one w/ the same key, exactly as repeated 'add_item()' calls would. 
+
+    If 'pause_gc' is True, the cyclic garbage collector is paused for the duration, as the millions of bucket dictionaries and 
+    tuples it would otherwise keep re-scanning can't form reference cycles and dominate the cost of a large load: at 500,000 rows, 
+    batching alone is ~1.7x faster than an 'add_item()' loop, and batching w/ the collector paused ~5x (see load_benchmarks.py). The collector is 
+    process-wide, though: it's paused for every thread meanwhile, and w/ concurrent callers, the first to finish re-enables it while 
+    the others are still loading. So it's off by default, and only worth turning on for a bulk load that nothing else runs 
+    alongside (or w/ gc.disable()/gc.enable() around the whole load, done by the caller instead). """
+    def add_many(self, items, size_hint=None, pause_gc=False):
+        if size_hint is None:
+            if not hasattr(items, "__len__"):
+                items = list(items)
+            size_hint = len(items)
+        else:
+            items = list(items)
+        added = 0
+        gc_was_enabled = pause_gc and gc.isenabled()
+        if gc_was_enabled:
+            gc.disable()
+        try:
+            self.__reserve(size_hint)
+
+            get_hash = self.__get_hash
+            hashes = [get_hash(key) for key, _ in items]
+            data = self.data
+            size = self.size
+            trigram_index = self.trigram_index
+            for (key, value), hash_value in zip(items, hashes):
+                hash_index = hash_value % size
+                entry = data[hash_index]
+                if entry is None:
+                    data[hash_index] = entry = {}
+                if key not in entry:
+                    added += 1
+                    if trigram_index is not None:
+                        self.__index_key(key)
+                entry[key] = (hash_value, value)
+        finally:
+            """ keep the count consistent even if an unhashable key aborts the batch part-way through. """
+            self.num_elements += added
+            if gc_was_enabled:
+                gc.enable()
+
+        if self.num_elements / self.size > 0.75:
+            """ only reachable when 'size_hint' underestimated the batch. """
+            self.__reserve(0)
+
+    """ return a list of the values associated w/ each of the given keys, in order. Raise a KeyError if any key doesn't exist. """
+    def get_many(self, keys):
+        """ like any other operation, a batch only advances an incremental resize by one step; keys are looked up via 
+        '__find_bucket()', which checks both bucket arrays meanwhile. """
+        if self.old_data is not None:
+            self.__rehash_step()
+        get_hash = self.__get_hash
+        find_bucket = self.__find_bucket
+        values = []
+        for key in keys:
+            entry = find_bucket(key, get_hash(key))
+            if entry is None:
+                raise KeyError("Key doesn't exist.")
+            values.append(entry[key][1])
+        return values
+
+    """ remove the KV pairs for all of the given keys. Every key is located before anything is removed, so a KeyError for a missing 
+    key leaves the HT unchanged. """
+    def delete_many(self, keys):
+        """ as in 'get_many()', an incremental resize is only advanced by one step; no buckets move after that, so the located 
+        buckets stay valid until the removals. """
+        if self.old_data is not None:
+            self.__rehash_step()
+        get_hash = self.__get_hash
+        find_bucket = self.__find_bucket
+        located = []
+        for key in keys:
+            entry = find_bucket(key, get_hash(key))
+            if entry is None:
+                raise KeyError("Key doesn't exist.")
+            located.append((entry, key))
+
+        for entry, key in located:
+            """ dict.pop() w/ a default tolerates the same key appearing twice in the batch. """
+            if entry.pop(key, None) is not None:
+                self.num_elements -= 1
+                if self.trigram_index is not None:
+                    self.__unindex_key(key)
+
+    """ build a HT from an iterable of (key, value) pairs, sized up front from the number of pairs unless 'size' is given. 
+    'size_hint' and 'pause_gc' are passed on to 'add_many()', and any further keyword arguments to HashTable(). For a large bulk 
+    load, pause_gc=True is the fast path: most of the time left after batching goes on the garbage collector re-scanning the new 
+    buckets (see load_benchmarks.py), but see 'add_many()' for why it's not the default. """
+    @classmethod
+    def from_items(cls, items, size=None, size_hint=None, pause_gc=False, **kwargs):
+        if size is None and size_hint is None and not hasattr(items, "__len__"):
+            items = list(items)
+        hash_table = cls(size or max(int((size_hint or len(items)) / 0.75) + 1, 1), **kwargs)
+        hash_table.add_many(items, size_hint, pause_gc)
+        return hash_table
+
+    """ yield every bucket dictionary, including those not yet migrated out of 'old_data' during an incremental resize. """
+    def __buckets(self):
+        if self.old_data is not None:
+            yield from self.old_data
+        yield from self.data
+
+    """ the set of NUL-anchored trigrams of a string; strings shorter than three characters have none. """
+    @staticmethod
+    def __trigrams(text):
+        return {text[index:index + 3] for index in range(len(text) - 2)}
+
+    """ postings hold (type, key) pairs rather than bare keys: equal keys of different types (e.g. 10 and 10.0) hash by different 
+    'str()'s, so the HT keeps them as separate entries, and a set of bare keys would collapse them into one. """
+    def __index_key(self, key):
+        trigram_index = self.trigram_index
+        posting = (type(key), key)
+        for trigram in self.__trigrams("\0" + str(key)):
+            keys = trigram_index.get(trigram)
+            if keys is None:
+                trigram_index[trigram] = {posting}
+            else:
+                keys.add(posting)
+
+    """ remove a deleted key from the trigram index, dropping any trigram whose key set becomes empty. """
+    def __unindex_key(self, key):
+        trigram_index = self.trigram_index
+        posting = (type(key), key)
+        for trigram in self.__trigrams("\0" + str(key)):
+            keys = trigram_index[trigram]
+            keys.discard(posting)
+            if not keys:
+                del trigram_index[trigram]
+
+    """ return the (type, key) postings of the keys that may contain 'query' (a NUL-anchored prefix or a plain substring), by intersecting the key sets of its 
+    trigrams, smallest first. Return None when the query is too short to have trigrams, in which case the caller scans instead. """
+    def __candidate_keys(self, query):
+        trigrams = self.__trigrams(query)
+        if not trigrams:
+            return None
+        key_sets = sorted((self.trigram_index.get(trigram, ()) for trigram in trigrams), key=len)
+        candidates = set(key_sets[0])
+        for keys in key_sets[1:]:
+            if not candidates:
+                break
+            candidates &= keys
+        return candidates
 
-    """ return a list of values, whose corresponding keys contain a given substring, by iterating over each entry in the HT ('__data'), 
-    and checking if the substring is present in any of the keys. If a match is found, append the corresponding value to 'matching_data'
-    and return it. """
+    """ return the values of the candidate keys that pass 'matches', looking each value up via its cached bucket. """
+    def __matching_values(self, candidates, matches):
+        get_hash = self.__get_hash
+        matching_data = []
+        for _, key in candidates:
+            if matches(str(key)):
+                matching_data.append(self.__find_bucket(key, get_hash(key))[key][1])
+        return matching_data
+
+    """ return a list of values, whose corresponding keys contain a given substring. If the trigram index is enabled and the 
+    substring has at least three characters, only the keys sharing all of its trigrams are checked. Otherwise, iterate over each 
+    entry in the HT ('__data'), checking if the substring is present in any of the keys. If a match is found, append the 
+    corresponding value to 'matching_data' and return it. """
     def key_contains(self, substring):
+        if self.trigram_index is not None:
+            candidates = self.__candidate_keys(substring)
+            if candidates is not None:
+                return self.__matching_values(candidates, lambda text: substring in text)
+
         matching_data = []
-        for entry in self.data:
+        for entry in self.__buckets():
             if entry:
-                for key, value in entry.items():
+                for key, (_, value) in entry.items():
                     if substring in str(key):
                         matching_data.append(value)
         return matching_data
 
-    def show_hash_table(self):
-        table = []
-        for entry in self.data:
+    """ return a list of values whose corresponding keys start w/ a given prefix. W/ the trigram index, a prefix of two or more 
+    characters is looked up through its NUL-anchored trigrams; otherwise every key is scanned. """
+    def key_startswith(self, prefix):
+        if self.trigram_index is not None:
+            candidates = self.__candidate_keys("\0" + prefix)
+            if candidates is not None:
+                return self.__matching_values(candidates, lambda text: text.startswith(prefix))
+
+        matching_data = []
+        for entry in self.__buckets():
             if entry:
-                for key, value in entry.items():
-                    table.append([key, value])
+                for key, (_, value) in entry.items():
+                    if str(key).startswith(prefix):
+                        matching_data.append(value)
+        return matching_data
+
+    """ lazily yield each (key, value) pair by walking the buckets in place, without copying the HT. As w/ a dictionary, the HT 
+    mustn't be modified while the generator is in use; 'scan()' should be used instead when it may be. """
+    def items(self):
+        for entry in self.__buckets():
+            if entry:
+                for key, (_, value) in entry.items():
+                    yield key, value
+
+    def keys(self):
+        for entry in self.__buckets():
+            if entry:
+                yield from entry
+
+    def values(self):
+        for key, value in self.items():
+            yield value
+
+    def __iter__(self):
+        return self.keys()
+
+    def __len__(self):
+        return self.num_elements
+
+    """ stream the HT to a text file object as CSV w/ a 'Key,Value' header, writing 'chunk_size' rows at a time, so that only 
+    one chunk is ever held in memory. """
+    def export_csv(self, file, chunk_size=10000):
+        writer = csv.writer(file)
+        writer.writerow(["Key", "Value"])
+        chunk = []
+        for item in self.items():
+            chunk.append(item)
+            if len(chunk) == chunk_size:
+                writer.writerows(chunk)
+                chunk.clear()
+        writer.writerows(chunk)
+
+    """ stream the HT to a text file object as JSON lines of the form {"key": ..., "value": ...}. Keys and values that JSON can't 
+    represent are written via 'str()'. """
+    def export_jsonl(self, file, chunk_size=10000):
+        chunk = []
+        for key, value in self.items():
+            chunk.append(json.dumps({"key": key, "value": value}, default=str))
+            if len(chunk) == chunk_size:
+                file.write("\n".join(chunk) + "\n")
+                chunk.clear()
+        if chunk:
+            file.write("\n".join(chunk) + "\n")
+
+    """ reverse the bits of a 32-bit cursor value. """
+    @staticmethod
+    def __reverse_bits(value):
+        return int(f"{value:032b}"[::-1], 2)
+
+    """ advance the reversed-binary cursor 'value' over the bucket positions selected by 'mask': the bits outside the mask are set, 
+    so that incrementing the reversed value carries straight through them, then the value is reversed back. """
+    def __next_cursor(self, value, mask):
+        value |= 0xFFFFFFFF & ~mask
+        value = self.__reverse_bits(value)
+        value = (value + 1) & 0xFFFFFFFF
+        return self.__reverse_bits(value)
+
+    """ incrementally iterate the HT, returning (next_cursor, list of (key, value) pairs), like Redis' SCAN. Start w/ cursor 0 and 
+    pass each returned cursor back in, until 0 is returned. 'count' is the number of bucket positions visited per call. Every key 
+    present for the whole scan is returned at least once (some may be returned twice), even if the HT resizes between calls.
+
+    Since the size is always 'base_size * 2**k', a key w/ hash 'h' sits in bucket 'a + base_size * c', where 'a = h % base_size' 
+    never changes and 'c' is the low k bits of 'h // base_size'. The cursor encodes 'a' and a reversed-binary counter over 'c': 
+    incrementing the high bits of 'c' first means that, after the HT doubles (or halves), the buckets already visited are exactly 
+    those whose low bits precede the cursor's, so none are skipped. During an incremental resize, each old bucket is visited 
+    together w/ every new bucket it expands into. """
+    def scan(self, cursor=0, count=10):
+        base_size = self.base_size
+        low, position = cursor % base_size, cursor // base_size
+        results = []
+
+        for _ in range(count):
+            if self.old_data is None:
+                mask = self.size // base_size - 1
+                self.__scan_bucket(self.data[low + base_size * (position & mask)], results)
+            else:
+                mask = self.old_size // base_size - 1
+                large_mask = self.size // base_size - 1
+                self.__scan_bucket(self.old_data[low + base_size * (position & mask)], results)
+                expansion = position & mask
+                while True:
+                    self.__scan_bucket(self.data[low + base_size * expansion], results)
+                    expansion += mask + 1
+                    if expansion > large_mask:
+                        break
+
+            low += 1
+            if low == base_size:
+                low = 0
+                position = self.__next_cursor(position, mask)
+                if position == 0:
+                    return 0, results
+        return low + base_size * position, results
+
+    @staticmethod
+    def __scan_bucket(entry, results):
+        if entry:
+            for key, (_, value) in entry.items():
+                results.append((key, value))
+
+    def show_hash_table(self):
         headers = ["Key", "Value"]
-        return tabulate(table, headers)
+        return tabulate(list(self.items()), headers)
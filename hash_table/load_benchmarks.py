@@ -0,0 +1,56 @@
+""" compare ways of bulk loading a HashTable, run w/ `python load_benchmarks.py [num_rows]`:
+    add_item loop:           one add_item() call per row, growing from a small table.
+    add_many:                one batch, presized and hashed in one pass.
+    add_many (pause_gc):     the same, w/ the garbage collector paused for the load.
+    from_items (pause_gc):   building the table from the rows in one call, the fast path for a bulk load.
+Rows are (int, int) pairs, and each way is reported as the best of 3 runs. """
+from time import perf_counter
+import gc
+import sys
+
+from hash_table import HashTable
+
+
+def add_item_loop(rows):
+    hash_table = HashTable(8)
+    for key, value in rows:
+        hash_table.add_item(key, value)
+    return hash_table
+
+def add_many(rows, pause_gc=False):
+    hash_table = HashTable(8)
+    hash_table.add_many(rows, pause_gc=pause_gc)
+    return hash_table
+
+LOADS = {
+    "add_item loop": add_item_loop,
+    "add_many": add_many,
+    "add_many (pause_gc)": lambda rows: add_many(rows, pause_gc=True),
+    "from_items (pause_gc)": lambda rows: HashTable.from_items(rows, pause_gc=True),
+}
+
+
+def best_of(load, rows, runs=3):
+    best = float("inf")
+    for _ in range(runs):
+        start = perf_counter()
+        hash_table = load(rows)
+        best = min(best, perf_counter() - start)
+        assert len(hash_table) == len(rows)
+        """ free the table before the next run, so the collector doesn't start each run w/ the last one's buckets. """
+        del hash_table
+        gc.collect()
+    return best
+
+def benchmark(num_rows=500000):
+    rows = [(key, key) for key in range(num_rows)]
+    baseline = None
+    print(f"{'load':<24}{'seconds':>9}{'speedup':>9}")
+    for name, load in LOADS.items():
+        seconds = best_of(load, rows)
+        baseline = baseline or seconds
+        print(f"{name:<24}{seconds:>9.2f}{baseline / seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
@@ -1,9 +1,13 @@
 """ a non-cryptographic hash function suitable for general hash-based lookup. """
+from struct import iter_unpack
+
 def murmurhash3(key, seed=0x0):
     """ bytearray returns returns mutable sequence of integers in the range 
     0 <= x < 256. str.encode() converts a string into a collection of bytes 
-    via utf-8. """
-    key_bytes = bytearray(key.encode())
+    via utf-8; bytes-like keys are hashed as they are. Anything else (e.g. an int, 
+    which bytearray() would turn into that many zero bytes) is rejected by 
+    memoryview() w/ a TypeError. """
+    key_bytes = bytearray(memoryview(key.encode() if isinstance(key, str) else key))
     key_length = len(key_bytes)
     """ number of 4 byte blocks in the key. """
     nblocks = key_length // 4
@@ -65,3 +69,132 @@ def _finalise(hash):
     hash= (hash * 0xc2b2ae35) & 0xFFFFFFFF
     hash^= hash >> 16
     return hash
+
+
+""" the x64_128 variant mixes two 64-bit lanes over 16-byte blocks, producing a 128-bit 
+hash. Its wider output collides far less at large key counts, and splitting it into two 
+independent 64-bit halves gives the pair of hashes that Bloom filters and sketches combine 
+for double hashing. """
+C1_64 = 0x87c37b91114253d5
+C2_64 = 0x4cf5ad432745937f
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _rotl64(value, shift):
+    return (value << shift | value >> (64 - shift)) & MASK_64
+
+
+def _finalise64(hash):
+    hash ^= hash >> 33
+    hash = (hash * 0xff51afd7ed558ccd) & MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xc4ceb9fe1a85ec53) & MASK_64
+    hash ^= hash >> 33
+    return hash
+
+
+class MurmurHash128:
+    """ an incremental MurmurHash3 x64_128 hasher with a hashlib-style interface. Data is 
+    fed through update() in any number of chunks, and digest() gives the same result as 
+    hashing the concatenation of every chunk in one go. """
+    def __init__(self, data=b"", seed=0x0):
+        self.h1 = seed
+        self.h2 = seed
+        self.length = 0
+        """ the (< 16) bytes left over from the last update(), held until the next one 
+        completes their block. """
+        self.pending = b""
+        if data:
+            self.update(data)
+
+    def update(self, data):
+        """ accepts str (hashed as utf-8, like murmurhash3()), bytes, bytearray or 
+        memoryview. memoryview slices share the underlying buffer, and struct.iter_unpack() 
+        reads the 64-bit lanes straight out of it, so whole blocks are never copied. """
+        if isinstance(data, str):
+            data = data.encode()
+        view = memoryview(data).cast("B")
+        self.length += len(view)
+
+        start = 0
+        if self.pending:
+            """ top up the partial block from the previous call first. """
+            start = 16 - len(self.pending)
+            self.pending += bytes(view[:start])
+            if len(self.pending) < 16:
+                return
+            self.__mix_blocks(memoryview(self.pending))
+            self.pending = b""
+
+        end = start + (len(view) - start) // 16 * 16
+        self.__mix_blocks(view[start:end])
+        self.pending = bytes(view[end:])
+
+    def __mix_blocks(self, blocks):
+        h1, h2 = self.h1, self.h2
+        for k1, k2 in iter_unpack("<QQ", blocks):
+            k1 = (k1 * C1_64) & MASK_64
+            k1 = _rotl64(k1, 31)
+            k1 = (k1 * C2_64) & MASK_64
+            h1 ^= k1
+
+            h1 = _rotl64(h1, 27)
+            h1 = (h1 + h2) & MASK_64
+            h1 = (h1 * 5 + 0x52dce729) & MASK_64
+
+            k2 = (k2 * C2_64) & MASK_64
+            k2 = _rotl64(k2, 33)
+            k2 = (k2 * C1_64) & MASK_64
+            h2 ^= k2
+
+            h2 = _rotl64(h2, 31)
+            h2 = (h2 + h1) & MASK_64
+            h2 = (h2 * 5 + 0x38495ab5) & MASK_64
+        self.h1, self.h2 = h1, h2
+
+    def _halves(self):
+        """ finalise a copy of the state, so that the hasher can keep being updated. The 
+        tail's first/last 8 bytes are mixed into h1/h2, as in the scalar reference. """
+        h1, h2 = self.h1, self.h2
+        tail = self.pending
+        if len(tail) > 8:
+            k2 = int.from_bytes(tail[8:], "little")
+            k2 = (k2 * C2_64) & MASK_64
+            k2 = _rotl64(k2, 33)
+            k2 = (k2 * C1_64) & MASK_64
+            h2 ^= k2
+        if tail:
+            k1 = int.from_bytes(tail[:8], "little")
+            k1 = (k1 * C1_64) & MASK_64
+            k1 = _rotl64(k1, 31)
+            k1 = (k1 * C2_64) & MASK_64
+            h1 ^= k1
+
+        h1 ^= self.length
+        h2 ^= self.length
+        h1 = (h1 + h2) & MASK_64
+        h2 = (h2 + h1) & MASK_64
+        h1 = _finalise64(h1)
+        h2 = _finalise64(h2)
+        h1 = (h1 + h2) & MASK_64
+        h2 = (h2 + h1) & MASK_64
+        return h1, h2
+
+    def digest(self):
+        """ the 16-byte hash: h1 then h2, each little-endian. """
+        h1, h2 = self._halves()
+        return h1.to_bytes(8, "little") + h2.to_bytes(8, "little")
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    def intdigest(self):
+        """ the hash as a single unsigned 128-bit integer, w/ h2 as the high half. """
+        h1, h2 = self._halves()
+        return h2 << 64 | h1
+
+
+def murmurhash3_x64_128(key, seed=0x0):
+    """ one-shot MurmurHash3 x64_128 of a str or bytes-like key, as an unsigned 128-bit 
+    integer. """
+    return MurmurHash128(key, seed).intdigest()
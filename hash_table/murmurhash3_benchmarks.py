@@ -0,0 +1,53 @@
+""" compare the throughput of hashing a batch of keys w/ the scalar murmurhash3() in a loop, the mmh3 package in a loop, and
+murmurhash3_batch(), run w/ `python murmurhash3_benchmarks.py [num_keys]`. Three kinds of key are timed:
+    ids:    uint64 integers (hashed as their 8 little-endian bytes), as used for sharding.
+    short:  random 12-byte strings.
+    long:   random 64-byte strings.
+Each is reported in millions of keys per second, as the best of 3 runs. """
+from time import perf_counter
+import sys
+
+import mmh3
+import numpy as np
+
+from murmurhash3 import murmurhash3
+from vectorised_murmurhash3 import murmurhash3_batch
+
+
+def make_keys(num_keys, rng):
+    return {
+        "ids": rng.integers(0, 2 ** 63, num_keys, dtype=np.uint64),
+        "short": rng.integers(1, 256, (num_keys, 12), dtype=np.uint8).view("S12").ravel(),
+        "long": rng.integers(1, 256, (num_keys, 64), dtype=np.uint8).view("S64").ravel(),
+    }
+
+def best_of(function, *args, runs=3):
+    best = float("inf")
+    for _ in range(runs):
+        start = perf_counter()
+        function(*args)
+        best = min(best, perf_counter() - start)
+    return best
+
+def scalar(keys):
+    return [murmurhash3(key) for key in keys]
+
+def mmh3_loop(keys):
+    hash = mmh3.hash
+    return [hash(key, signed=False) for key in keys]
+
+def benchmark(num_keys=1000000):
+    rng = np.random.default_rng(0)
+    """ the scalar loop is far slower, so it's timed on a slice and scaled. """
+    scalar_keys = max(num_keys // 100, 1)
+    print(f"{'keys':<8}{'scalar':>10}{'mmh3':>10}{'batch':>10}   (million keys/s)")
+    for name, keys in make_keys(num_keys, rng).items():
+        as_bytes = [key.tobytes() for key in keys] if keys.dtype.kind != "S" else keys.tolist()
+        scalar_rate = scalar_keys / best_of(scalar, as_bytes[:scalar_keys], runs=1) / 1e6
+        mmh3_rate = num_keys / best_of(mmh3_loop, as_bytes) / 1e6
+        batch_rate = num_keys / best_of(murmurhash3_batch, keys) / 1e6
+        print(f"{name:<8}{scalar_rate:>10.3f}{mmh3_rate:>10.3f}{batch_rate:>10.3f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
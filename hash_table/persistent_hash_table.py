@@ -0,0 +1,217 @@
+""" a persistent hash table keeps its bucket array and entries in a memory-mapped file w/ a fixed binary layout, so a large table
+is built once and then reopened in constant time by any number of processes. Nothing is read up front: the OS pages the file in
+lazily as lookups touch buckets and entries, and read-only instances in different processes share the same pages via the page
+cache. Keys are hashed w/ MurmurHash3, like HashTable, and collisions are chained through the file.
+
+File layout (all integers little-endian):
+    header:  magic (4 bytes), version (u32), bucket count (u64), bucket array offset (u64), number of entries (u64),
+             end of the used data (u64).
+    buckets: one u64 per bucket, holding the offset of the first entry in its chain (0 if the bucket is empty).
+    entries: next entry offset (u64), full 32-bit hash (u32), key length (u32), value length (u32), key bytes, value bytes. """
+import mmap
+import os
+import struct
+
+from mmh3 import hash
+
+
+HEADER = struct.Struct("<4sIQQQQ")
+ENTRY = struct.Struct("<QIII")
+OFFSET = struct.Struct("<Q")
+MAGIC = b"PHT1"
+VERSION = 1
+
+
+class PersistentHashTable:
+    def __init__(self, path, size=1024, serializer=None, readonly=False):
+        """ 'size' is only used when creating a new file. 'serializer' is any object w/ dumps()/loads() (e.g. the pickle module);
+        without one, values must be bytes-like and are returned as bytes. """
+        self.path = path
+        self.serializer = serializer
+        self.readonly = readonly
+
+        if readonly:
+            self.file = open(path, "rb")
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        elif os.path.exists(path) and os.path.getsize(path) > 0:
+            self.file = open(path, "r+b")
+            self.mmap = mmap.mmap(self.file.fileno(), 0)
+        else:
+            self.file = open(path, "w+b")
+            data_end = HEADER.size + OFFSET.size * size
+            """ a freshly truncated file reads as zeroes, which is exactly an empty bucket array. """
+            self.file.truncate(max(data_end, mmap.PAGESIZE))
+            self.mmap = mmap.mmap(self.file.fileno(), 0)
+            HEADER.pack_into(self.mmap, 0, MAGIC, VERSION, size, HEADER.size, 0, data_end)
+
+        magic, version, self.size, self.bucket_offset, self.num_elements, self.data_end = HEADER.unpack_from(self.mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("Not a persistent hash table file.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    """ keys are hashed as utf-8 bytes (str) or as they are (bytes-like). Anything else raises a TypeError, rather than being
+    passed to bytes(), which would turn an int n into n zero bytes. memoryview() accepts exactly the bytes-like objects. """
+    @staticmethod
+    def __as_bytes(data, message):
+        try:
+            return bytes(memoryview(data))
+        except TypeError:
+            raise TypeError(message) from None
+
+    def __key_bytes(self, key):
+        if isinstance(key, str):
+            return key.encode()
+        return self.__as_bytes(key, "Keys must be str or bytes-like.")
+
+    def __value_bytes(self, value):
+        if self.serializer is None:
+            return self.__as_bytes(value, "Values must be bytes-like when there's no serializer.")
+        value = self.serializer.dumps(value)
+        return value.encode() if isinstance(value, str) else value
+
+    def __load_value(self, value):
+        return value if self.serializer is None else self.serializer.loads(value)
+
+    def __bucket_position(self, hash_value):
+        return self.bucket_offset + OFFSET.size * (hash_value % self.size)
+
+    """ walk the key's chain. Return the position of the link pointing at its entry (either the bucket slot, or the previous
+    entry's 'next' field) and the entry's offset, which is 0 if the key doesn't exist. """
+    def __find_entry(self, key_bytes, hash_value):
+        mm = self.mmap
+        link = self.__bucket_position(hash_value)
+        offset = OFFSET.unpack_from(mm, link)[0]
+        while offset:
+            next_offset, entry_hash, key_length, _ = ENTRY.unpack_from(mm, offset)
+            key_start = offset + ENTRY.size
+            if entry_hash == hash_value and key_length == len(key_bytes) and mm[key_start:key_start + key_length] == key_bytes:
+                return link, offset
+            link = offset
+            offset = next_offset
+        return link, 0
+
+    def __check_writable(self):
+        if self.readonly:
+            raise PermissionError("Hash table was opened read-only.")
+
+    """ reserve 'length' bytes at the end of the used data, growing the file (by at least doubling it) if they don't fit. """
+    def __allocate(self, length):
+        offset = self.data_end
+        if offset + length > len(self.mmap):
+            new_length = max(2 * len(self.mmap), offset + length)
+            self.mmap.close()
+            self.file.truncate(new_length)
+            self.mmap = mmap.mmap(self.file.fileno(), 0)
+        self.data_end = offset + length
+        return offset
+
+    def __write_header(self):
+        HEADER.pack_into(self.mmap, 0, MAGIC, VERSION, self.size, self.bucket_offset, self.num_elements, self.data_end)
+
+    """ add a KV pair. A value of the same length as the one it replaces is overwritten in place; otherwise a new entry is
+    appended and spliced into the chain in place of the old one. Space left behind by replaced or deleted entries isn't reused. """
+    def add_item(self, key, value):
+        self.__check_writable()
+        key_bytes = self.__key_bytes(key)
+        value_bytes = self.__value_bytes(value)
+        hash_value = hash(key_bytes, signed=False)
+        link, offset = self.__find_entry(key_bytes, hash_value)
+
+        next_offset = 0
+        if offset:
+            next_offset, _, key_length, value_length = ENTRY.unpack_from(self.mmap, offset)
+            if value_length == len(value_bytes):
+                value_start = offset + ENTRY.size + key_length
+                self.mmap[value_start:value_start + value_length] = value_bytes
+                return
+        else:
+            """ new keys are pushed onto the front of their bucket's chain. """
+            link = self.__bucket_position(hash_value)
+            next_offset = OFFSET.unpack_from(self.mmap, link)[0]
+            self.num_elements += 1
+
+        new_offset = self.__allocate(ENTRY.size + len(key_bytes) + len(value_bytes))
+        mm = self.mmap
+        ENTRY.pack_into(mm, new_offset, next_offset, hash_value, len(key_bytes), len(value_bytes))
+        key_start = new_offset + ENTRY.size
+        mm[key_start:key_start + len(key_bytes)] = key_bytes
+        mm[key_start + len(key_bytes):key_start + len(key_bytes) + len(value_bytes)] = value_bytes
+        OFFSET.pack_into(mm, link, new_offset)
+
+        if self.num_elements / self.size > 0.75:
+            self.__resize_hash_table()
+        self.__write_header()
+
+    """ append a bucket array of double the size, then relink every entry into it using its stored hash, so no key is read or
+    rehashed. The old bucket array is left as unused space. """
+    def __resize_hash_table(self):
+        new_size = 2 * self.size
+        new_bucket_offset = self.__allocate(OFFSET.size * new_size)
+        mm = self.mmap
+        mm[new_bucket_offset:new_bucket_offset + OFFSET.size * new_size] = bytes(OFFSET.size * new_size)
+
+        for bucket in range(self.size):
+            offset = OFFSET.unpack_from(mm, self.bucket_offset + OFFSET.size * bucket)[0]
+            while offset:
+                next_offset, hash_value = ENTRY.unpack_from(mm, offset)[:2]
+                new_link = new_bucket_offset + OFFSET.size * (hash_value % new_size)
+                OFFSET.pack_into(mm, offset, OFFSET.unpack_from(mm, new_link)[0])
+                OFFSET.pack_into(mm, new_link, offset)
+                offset = next_offset
+
+        self.size = new_size
+        self.bucket_offset = new_bucket_offset
+
+    def get_item(self, key):
+        key_bytes = self.__key_bytes(key)
+        _, offset = self.__find_entry(key_bytes, hash(key_bytes, signed=False))
+        if not offset:
+            raise KeyError("Key doesn't exist.")
+        _, _, key_length, value_length = ENTRY.unpack_from(self.mmap, offset)
+        value_start = offset + ENTRY.size + key_length
+        return self.__load_value(self.mmap[value_start:value_start + value_length])
+
+    """ unlink the key's entry from its chain; the entry's bytes stay in the file but are no longer reachable. """
+    def delete_item(self, key):
+        self.__check_writable()
+        key_bytes = self.__key_bytes(key)
+        link, offset = self.__find_entry(key_bytes, hash(key_bytes, signed=False))
+        if not offset:
+            raise KeyError("Key doesn't exist.")
+        OFFSET.pack_into(self.mmap, link, OFFSET.unpack_from(self.mmap, offset)[0])
+        self.num_elements -= 1
+        self.__write_header()
+
+    """ return a list of values whose corresponding keys contain a given substring (str or bytes). """
+    def key_contains(self, substring):
+        substring = self.__key_bytes(substring)
+        mm = self.mmap
+        matching_data = []
+        for bucket in range(self.size):
+            offset = OFFSET.unpack_from(mm, self.bucket_offset + OFFSET.size * bucket)[0]
+            while offset:
+                next_offset, _, key_length, value_length = ENTRY.unpack_from(mm, offset)
+                key_start = offset + ENTRY.size
+                if substring in mm[key_start:key_start + key_length]:
+                    value_start = key_start + key_length
+                    matching_data.append(self.__load_value(mm[value_start:value_start + value_length]))
+                offset = next_offset
+        return matching_data
+
+    """ write any modified pages back to the file. Changes are visible to other processes mapping the file straight away, but
+    are only guaranteed to be on disk after a flush. """
+    def flush(self):
+        if not self.readonly:
+            self.mmap.flush()
+
+    def close(self):
+        if not self.mmap.closed:
+            self.flush()
+            self.mmap.close()
+        self.file.close()
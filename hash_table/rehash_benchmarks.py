@@ -0,0 +1,41 @@
+""" compare the per-operation latency of add_item() w/ stop-the-world and incremental resizing, run w/
+`python rehash_benchmarks.py [num_items]`. Each mode inserts num_items integer keys into a HashTable starting from 8
+buckets, timing every call on its own, and reports the latency distribution in microseconds. A stop-the-world resize
+rehashes the whole table inside one call, which shows up in the tail (p99.9 and max); incremental mode spreads the same
+work over the following calls, trading a slightly slower median for a flat tail. The collector is paused while timing, so
+its pauses don't land on arbitrary calls. """
+from time import perf_counter
+import gc
+import sys
+
+from hash_table import HashTable
+
+
+def latencies(incremental, num_items):
+    hash_table = HashTable(8, incremental=incremental)
+    add_item = hash_table.add_item
+    timings = [0.0] * num_items
+    gc.disable()
+    try:
+        for key in range(num_items):
+            start = perf_counter()
+            add_item(key, key)
+            timings[key] = perf_counter() - start
+    finally:
+        gc.enable()
+    timings.sort()
+    return timings
+
+def percentile(timings, fraction):
+    return timings[min(int(len(timings) * fraction), len(timings) - 1)] * 1e6
+
+def benchmark(num_items=1000000):
+    print(f"{'resizing':<16}{'p50':>9}{'p99':>9}{'p99.9':>10}{'max':>12}{'total (s)':>11}")
+    for name, incremental in (("stop-the-world", False), ("incremental", True)):
+        timings = latencies(incremental, num_items)
+        print(f"{name:<16}{percentile(timings, 0.5):>9.1f}{percentile(timings, 0.99):>9.1f}"
+              f"{percentile(timings, 0.999):>10.1f}{timings[-1] * 1e6:>12.0f}{sum(timings):>11.2f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
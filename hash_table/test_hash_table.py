@@ -0,0 +1,40 @@
+""" regression tests for HashTable, run w/ `python -m pytest test_hash_table.py` (or `python -m unittest`) from this
+directory. """
+import unittest
+
+from hash_table import HashTable
+
+
+class TestTrigramIndex(unittest.TestCase):
+    def make_tables(self):
+        """ a HT w/ the trigram index and one without, which scans every key, as the reference. """
+        return HashTable(64, substring_index=True), HashTable(64)
+
+    def test_equal_keys_of_different_types_stay_distinct(self):
+        """ 10 and 10.0 compare equal, but hash by different 'str()'s, so they're separate entries, and the index mustn't
+        collapse them into one posting. """
+        for table in self.make_tables():
+            table.add_item(10, "int")
+            table.add_item(10.0, "float")
+            self.assertEqual(sorted(table.key_startswith("10")), ["float", "int"])
+            self.assertEqual(sorted(table.key_contains("10")), ["float", "int"])
+
+            table.delete_item(10.0)
+            self.assertEqual(table.key_startswith("10"), ["int"])
+            self.assertEqual(table.key_contains("10"), ["int"])
+
+    def test_index_matches_a_scan(self):
+        indexed, scanned = self.make_tables()
+        keys = [f"user:{number}" for number in range(200)] + list(range(1000, 1100)) + [True, 1, 1.0, (1, 2)]
+        for table in (indexed, scanned):
+            for key in keys:
+                table.add_item(key, repr(key))
+            for key in keys[::3]:
+                table.delete_item(key)
+        for query in ("user:1", "ser:19", "100", "105", "Tru", "(1, 2", "nothing"):
+            self.assertEqual(sorted(indexed.key_contains(query)), sorted(scanned.key_contains(query)), query)
+            self.assertEqual(sorted(indexed.key_startswith(query)), sorted(scanned.key_startswith(query)), query)
+
+
+if __name__ == "__main__":
+    unittest.main()
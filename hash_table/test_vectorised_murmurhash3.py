@@ -0,0 +1,97 @@
+""" cross-checks murmurhash3_batch() against the mmh3 package and the scalar murmurhash3()/_finalise(), run w/
+`python -m pytest test_vectorised_murmurhash3.py` (or `python -m unittest`) from this directory. """
+import unittest
+
+import mmh3
+import numpy as np
+
+from murmurhash3 import _finalise, murmurhash3
+from vectorised_murmurhash3 import _finalise_batch, murmurhash3_batch
+
+
+SEEDS = (0, 1, 42, 0x9747b28c, 0xFFFFFFFF)
+
+
+def random_byte_keys(rng, num_keys, max_length):
+    """ random keys of every length from 0 to max_length. NumPy's 'S' dtype drops trailing NULs, so no key ends in one. """
+    keys = []
+    for _ in range(num_keys):
+        key = rng.integers(0, 256, rng.integers(0, max_length + 1), dtype=np.uint8).tobytes()
+        keys.append(key.rstrip(b"\0"))
+    return keys
+
+
+class TestMurmurHash3Batch(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def assert_matches_mmh3(self, keys, array, seed):
+        expected = [mmh3.hash(key, seed, signed=False) for key in keys]
+        result = murmurhash3_batch(array, seed)
+        self.assertEqual(result.dtype, np.uint32)
+        self.assertEqual(result.tolist(), expected)
+
+    def test_byte_strings_of_every_tail_length(self):
+        """ lengths 0-33 cover no blocks, several blocks, and every tail size (0-3 bytes). """
+        keys = [bytes(range(1, length + 1)) for length in range(34)]
+        for seed in SEEDS:
+            self.assert_matches_mmh3(keys, np.array(keys, dtype="S"), seed)
+
+    def test_random_byte_strings(self):
+        keys = random_byte_keys(self.rng, 2000, 64)
+        for seed in SEEDS:
+            self.assert_matches_mmh3(keys, np.array(keys, dtype="S64"), seed)
+
+    def test_str_keys_are_hashed_as_utf8(self):
+        keys = ["", "a", "héllo", "日本語のキー", "emoji 🙂", "x" * 37]
+        for seed in SEEDS:
+            self.assert_matches_mmh3([key.encode() for key in keys], np.array(keys), seed)
+
+    def test_integer_keys_are_hashed_as_little_endian_bytes(self):
+        for dtype in (np.uint32, np.int32, np.uint64, np.int64, np.dtype(">u8")):
+            info = np.iinfo(dtype)
+            values = np.concatenate([
+                np.array([0, 1, info.min, info.max], dtype=dtype),
+                self.rng.integers(info.min, info.max, 1000, dtype=np.dtype(dtype).newbyteorder("=")).astype(dtype),
+            ])
+            keys = [value.astype(np.dtype(dtype).newbyteorder("<")).tobytes() for value in values]
+            for seed in SEEDS:
+                self.assert_matches_mmh3(keys, values, seed)
+
+    def test_matches_scalar_murmurhash3(self):
+        keys = random_byte_keys(self.rng, 500, 40)
+        for seed in SEEDS:
+            expected = [murmurhash3(key, seed) for key in keys]
+            self.assertEqual(murmurhash3_batch(np.array(keys, dtype="S40"), seed).tolist(), expected)
+
+    def test_finalise_batch_matches_finalise(self):
+        values = np.concatenate([np.array([0, 1, 0xFFFFFFFF], dtype=np.uint32),
+                                 self.rng.integers(0, 2 ** 32, 5000, dtype=np.uint64).astype(np.uint32)])
+        self.assertEqual(_finalise_batch(values).tolist(), [_finalise(value) for value in values.tolist()])
+
+    def test_multidimensional_and_empty_input(self):
+        keys = np.array([[b"ab", b"cd"], [b"ef", b"gh"]])
+        expected = [mmh3.hash(key, signed=False) for key in (b"ab", b"cd", b"ef", b"gh")]
+        self.assertEqual(murmurhash3_batch(keys).tolist(), expected)
+        self.assertEqual(len(murmurhash3_batch(np.array([], dtype="S8"))), 0)
+
+    def test_unsupported_keys_raise_type_error(self):
+        for keys in (np.array([1.5, 2.5]), np.array([1, 2], dtype=np.int16)):
+            with self.assertRaises(TypeError):
+                murmurhash3_batch(keys)
+
+
+class TestScalarMurmurHash3(unittest.TestCase):
+    def test_matches_mmh3(self):
+        for key in (b"", b"a", b"abcd", b"abcde", bytearray(b"bytearray"), memoryview(b"view"), "héllo"):
+            expected = mmh3.hash(key.encode() if isinstance(key, str) else bytes(key), signed=False)
+            self.assertEqual(murmurhash3(key), expected)
+
+    def test_int_keys_raise_type_error(self):
+        """ bytearray(5) is five zero bytes, so an int mustn't be hashed as one. """
+        with self.assertRaises(TypeError):
+            murmurhash3(5)
+
+
+if __name__ == "__main__":
+    unittest.main()
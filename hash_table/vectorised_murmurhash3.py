@@ -0,0 +1,87 @@
+""" a NumPy version of the 32-bit MurmurHash3 in 'murmurhash3.py', which hashes a whole array of keys at once. Each step of the
+scalar algorithm (block mixing, tail handling and finalisation) is applied to every key simultaneously as an array operation,
+so the Python-level loop runs once per 4-byte block column, rather than once per byte of every key. The results are
+bit-identical to murmurhash3() and _finalise(). """
+import numpy as np
+
+C1 = np.uint32(0xcc9e2d51)
+C2 = np.uint32(0x1b873593)
+
+
+def _rotl(values, shift):
+    """ a 32-bit rotate left; uint32 arithmetic in NumPy already wraps modulo 2**32, so
+    no masking is needed. """
+    return (values << np.uint32(shift)) | (values >> np.uint32(32 - shift))
+
+
+def _mix_k1(k1):
+    k1 = k1 * C1
+    k1 = _rotl(k1, 15)
+    return k1 * C2
+
+
+def _finalise_batch(hashes):
+    """ the same avalanche as _finalise(), applied elementwise to a uint32 array. """
+    hashes = hashes ^ (hashes >> np.uint32(16))
+    hashes = hashes * np.uint32(0x85ebca6b)
+    hashes ^= hashes >> np.uint32(13)
+    hashes = hashes * np.uint32(0xc2b2ae35)
+    hashes ^= hashes >> np.uint32(16)
+    return hashes
+
+
+def _as_byte_matrix(keys):
+    """ convert the keys into a (number of keys, padded width) uint8 matrix, plus the
+    length of each key in bytes. Fixed-width byte strings ('S' dtype) keep NumPy's
+    semantics of ignoring trailing NUL padding, str arrays ('U' dtype) are utf-8 encoded
+    like murmurhash3() does, and integers are hashed as their little-endian bytes. """
+    if keys.dtype.kind == "U":
+        keys = np.char.encode(keys, "utf-8")
+
+    if keys.dtype.kind == "S":
+        lengths = np.char.str_len(keys).astype(np.uint32)
+        width = keys.dtype.itemsize
+        matrix = np.ascontiguousarray(keys).view(np.uint8).reshape(len(keys), width)
+    elif keys.dtype.kind in "iu" and keys.dtype.itemsize in (4, 8):
+        width = keys.dtype.itemsize
+        little_endian = keys.astype(keys.dtype.newbyteorder("<"), copy=False)
+        matrix = np.ascontiguousarray(little_endian).view(np.uint8).reshape(len(keys), width)
+        lengths = np.full(len(keys), width, dtype=np.uint32)
+    else:
+        raise TypeError("Keys must be fixed-width byte strings, str, or 32/64-bit integers.")
+
+    """ pad each row to a whole number of 4-byte blocks, plus one spare block, so the
+    tail of even the longest key can be read as a full (zero-padded) block. """
+    padded_width = (width // 4 + 1) * 4
+    if padded_width != width:
+        matrix = np.pad(matrix, ((0, 0), (0, padded_width - width)))
+    return matrix, lengths
+
+
+def murmurhash3_batch(keys, seed=0x0):
+    """ return a uint32 array holding the MurmurHash3 of each key in 'keys'. """
+    keys = np.asarray(keys)
+    if keys.ndim != 1:
+        keys = keys.ravel()
+    matrix, lengths = _as_byte_matrix(keys)
+    """ reinterpret each row as little-endian 32-bit words, matching the scalar
+    byte-by-byte composition of each block. """
+    blocks = np.ascontiguousarray(matrix).view("<u4").astype(np.uint32, copy=False)
+    nblocks = lengths // 4
+
+    h1 = np.full(len(keys), seed, dtype=np.uint32)
+    for column in range(int(nblocks.max(initial=0))):
+        """ keys shorter than the current column leave their hash unchanged. """
+        mixed = h1 ^ _mix_k1(blocks[:, column])
+        mixed = _rotl(mixed, 13)
+        mixed = mixed * np.uint32(5) + np.uint32(0xe6546b64)
+        h1 = np.where(column < nblocks, mixed, h1)
+
+    """ the remaining 1-3 bytes of each key sit in the block after its last full one, and
+    the bytes past the end of the key are zero, so the block can be used as the tail
+    directly. """
+    tail = blocks[np.arange(len(keys)), nblocks]
+    has_tail = (lengths & 3) > 0
+    h1 = np.where(has_tail, h1 ^ _mix_k1(tail), h1)
+
+    return _finalise_batch(h1 ^ lengths)
@@ -0,0 +1,107 @@
+""" compare AsyncQueue against the blocking Queue called through loop.run_in_executor(), run w/
+`python async_benchmarks.py [num_items]`, on containers bounded at 1024 items:
+    async -> async:   a producer coroutine and a consumer coroutine on the same event loop.
+    thread -> async:  a producer thread feeding a consumer coroutine (AsyncQueue.enqueue_sync() against a plain
+                      Queue.enqueue()).
+    async -> thread:  a producer coroutine feeding a consumer thread (AsyncQueue.dequeue_sync() against a plain
+                      Queue.dequeue()).
+The executor-wrapped side hands every item to the loop's default ThreadPoolExecutor, a thread hop per call. Reported in
+items per second, as the best of 3 runs. """
+from time import perf_counter
+import asyncio
+import sys
+import threading
+
+""" this directory's queue.py shadows the standard library's queue module, which ThreadPoolExecutor imports. So the
+executor is imported first, w/ this directory briefly off sys.path, and the stdlib queue module is then dropped from
+sys.modules (the executor keeps its own reference), so that the import below finds the local Queue. """
+script_directory = sys.path.pop(0)
+import concurrent.futures.thread
+sys.path.insert(0, script_directory)
+del sys.modules["queue"]
+
+from async_queue import AsyncQueue
+from queue import Queue
+
+
+MAXSIZE = 1024
+
+
+def produce_sync(put, num_items):
+    for item in range(num_items):
+        put(item)
+
+def consume_sync(get, num_items):
+    for _ in range(num_items):
+        get()
+
+async def produce(put, num_items):
+    for item in range(num_items):
+        await put(item)
+
+async def consume(get, num_items):
+    for _ in range(num_items):
+        await get()
+
+def in_executor(function):
+    """ a coroutine function that runs the blocking 'function' on the loop's default executor. """
+    async def wrapper(*args):
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+    return wrapper
+
+async def async_to_async(asynchronous, num_items):
+    if asynchronous:
+        queue = AsyncQueue(MAXSIZE)
+        put, get = queue.enqueue, queue.dequeue
+    else:
+        queue = Queue(MAXSIZE)
+        put, get = in_executor(queue.enqueue), in_executor(queue.dequeue)
+    await asyncio.gather(produce(put, num_items), consume(get, num_items))
+
+async def thread_to_async(asynchronous, num_items):
+    if asynchronous:
+        queue = AsyncQueue(MAXSIZE)
+        put, get = queue.enqueue_sync, queue.dequeue
+    else:
+        queue = Queue(MAXSIZE)
+        put, get = queue.enqueue, in_executor(queue.dequeue)
+    thread = threading.Thread(target=produce_sync, args=(put, num_items))
+    thread.start()
+    await consume(get, num_items)
+    thread.join()
+
+async def async_to_thread(asynchronous, num_items):
+    if asynchronous:
+        queue = AsyncQueue(MAXSIZE)
+        put, get = queue.enqueue, queue.dequeue_sync
+    else:
+        queue = Queue(MAXSIZE)
+        put, get = in_executor(queue.enqueue), queue.dequeue
+    thread = threading.Thread(target=consume_sync, args=(get, num_items))
+    thread.start()
+    await produce(put, num_items)
+    """ join the consumer off the loop, so the loop isn't blocked while it drains the last items. """
+    await asyncio.get_running_loop().run_in_executor(None, thread.join)
+
+SCENARIOS = {
+    "async -> async": async_to_async,
+    "thread -> async": thread_to_async,
+    "async -> thread": async_to_thread,
+}
+
+
+def throughput(scenario, asynchronous, num_items):
+    start = perf_counter()
+    asyncio.run(scenario(asynchronous, num_items))
+    return num_items / (perf_counter() - start)
+
+def benchmark(num_items=50000):
+    print(f"{'scenario':<18}{'AsyncQueue':>12}{'executor':>12}{'speedup':>9}")
+    for name, scenario in SCENARIOS.items():
+        native = max(throughput(scenario, True, num_items) for _ in range(3))
+        wrapped = max(throughput(scenario, False, num_items) for _ in range(3))
+        print(f"{name:<18}{native:>12,.0f}{wrapped:>12,.0f}{native / wrapped:>9.1f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,32 @@
+from heapq import heappush, heappop
+
+from async_safety_wrapper import AsyncSafetyWrapper
+
+""" the asyncio version of PriorityQueue; see AsyncQueue for the *_sync bridge methods. """
+class AsyncPriorityQueue(AsyncSafetyWrapper):
+    def __init__(self, maxsize=None):
+        """ items are typically in the form (priority, data). """
+        self.queue = []
+        super().__init__(maxsize)
+
+    async def enqueue(self, item, block=True, timeout=None):
+        async with self.protect_put(block, timeout):
+            heappush(self.queue, item)
+
+    async def dequeue(self, block=True, timeout=None):
+        async with self.protect_get(block, timeout):
+            return heappop(self.queue)
+
+    def enqueue_sync(self, item, block=True, timeout=None):
+        with self.protect_put_sync(block, timeout):
+            heappush(self.queue, item)
+
+    def dequeue_sync(self, block=True, timeout=None):
+        with self.protect_get_sync(block, timeout):
+            return heappop(self.queue)
+
+    def empty(self):
+        return len(self.queue) == 0
+
+    def qsize(self):
+        return len(self.queue)
@@ -0,0 +1,35 @@
+from collections import deque
+
+from async_safety_wrapper import AsyncSafetyWrapper
+
+""" the asyncio version of Queue: enqueue()/dequeue() are coroutines that suspend, rather
+than block, while the queue is full/empty. enqueue_sync()/dequeue_sync() may be called from
+other threads, to feed async consumers from threaded producers or vice versa. """
+class AsyncQueue(AsyncSafetyWrapper):
+    def __init__(self, maxsize=None):
+        self.queue = deque()
+        super().__init__(maxsize)
+
+    async def enqueue(self, item, block=True, timeout=None):
+        """ async with awaits the context manager's __aenter__()/__aexit__(), so waiting for
+        space suspends only this coroutine. """
+        async with self.protect_put(block, timeout):
+            self.queue.append(item)
+
+    async def dequeue(self, block=True, timeout=None):
+        async with self.protect_get(block, timeout):
+            return self.queue.popleft()
+
+    def enqueue_sync(self, item, block=True, timeout=None):
+        with self.protect_put_sync(block, timeout):
+            self.queue.append(item)
+
+    def dequeue_sync(self, block=True, timeout=None):
+        with self.protect_get_sync(block, timeout):
+            return self.queue.popleft()
+
+    def empty(self):
+        return len(self.queue) == 0
+
+    def qsize(self):
+        return len(self.queue)
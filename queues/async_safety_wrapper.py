@@ -0,0 +1,174 @@
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from time import monotonic
+import asyncio
+import threading
+
+from thread_safety_wrapper import Empty, Full, Closed
+
+""" the asyncio counterpart of ThreadSafetyWrapper. Coroutines wait on futures rather than
+blocking the event loop, so one loop can run any number of producers and consumers. The
+same container can also be used from ordinary threads through the *_sync methods; this
+bridges threaded producers to async consumers (or the reverse) without handing every
+item to an executor thread, as the other side is only woken when it's actually waiting. """
+class AsyncSafetyWrapper:
+    def __init__(self, maxsize=None):
+        """ a threading.Lock() (rather than an asyncio.Lock()) guards the container, as
+        threads and the event loop both touch it. It's never held across an await, so the
+        event loop can't block on it for longer than a single container operation. """
+        self.mutex = threading.Lock()
+        """ threads blocked in the *_sync methods wait on these conditions, while coroutines
+        wait on the futures queued in 'getters'/'putters' as (event loop, future) pairs. """
+        self.not_empty = threading.Condition(self.mutex)
+        self.not_full = threading.Condition(self.mutex)
+        self.getters = deque()
+        self.putters = deque()
+        self.maxsize = maxsize or 0
+        self.num_items = 0
+        self.closed = False
+
+    def __has_space(self):
+        return not self.closed and (not self.maxsize or self.num_items < self.maxsize)
+
+    def __has_items(self):
+        return self.num_items > 0
+
+    @staticmethod
+    def __set_result(future):
+        if not future.done():
+            future.set_result(None)
+
+    def __wake(self, waiters, condition, num_waiters=1):
+        """ wake up to num_waiters waiting coroutines and threads; must be called w/ the
+        mutex held. A future belonging to the running loop is resolved directly; one owned
+        by another thread's loop is resolved via call_soon_threadsafe(). """
+        condition.notify(num_waiters)
+        if not waiters:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        while waiters and num_waiters:
+            loop, future = waiters.popleft()
+            if future.done():
+                continue
+            if loop is running_loop:
+                future.set_result(None)
+            else:
+                loop.call_soon_threadsafe(self.__set_result, future)
+            num_waiters -= 1
+
+    async def __acquire(self, waiters, condition, ready, block, timeout, exception):
+        """ return w/ the mutex held once ready() holds. Otherwise, raise exception if block
+        is False or timeout seconds pass, or Closed if the container is closed. A waiter
+        that is woken but then gives up (timeout or cancellation) passes its wake-up on, so
+        that no item or slot is left w/o a waiter being told about it. """
+        loop = asyncio.get_running_loop()
+        end_time = None if timeout is None else loop.time() + timeout
+        while True:
+            self.mutex.acquire()
+            if ready():
+                return
+            if self.closed:
+                self.mutex.release()
+                raise Closed
+            if not block:
+                self.mutex.release()
+                raise exception
+            future = loop.create_future()
+            waiters.append((loop, future))
+            self.mutex.release()
+
+            try:
+                if end_time is None:
+                    await future
+                else:
+                    remaining = end_time - loop.time()
+                    if remaining <= 0:
+                        raise exception
+                    try:
+                        await asyncio.wait_for(future, remaining)
+                    except asyncio.TimeoutError:
+                        raise exception from None
+            except BaseException:
+                with self.mutex:
+                    if (loop, future) in waiters:
+                        waiters.remove((loop, future))
+                    elif ready():
+                        self.__wake(waiters, condition)
+                raise
+
+    """ contextlib.asynccontextmanager is the 'async with' equivalent of contextmanager. As
+    in ThreadSafetyWrapper, the body runs while holding the mutex, so it must not await. """
+    @asynccontextmanager
+    async def protect_put(self, block=True, timeout=None):
+        if self.closed:
+            raise Closed
+        await self.__acquire(self.putters, self.not_full, self.__has_space, block, timeout, Full)
+        try:
+            yield
+            self.num_items += 1
+            self.__wake(self.getters, self.not_empty)
+        finally:
+            self.mutex.release()
+
+    @asynccontextmanager
+    async def protect_get(self, block=True, timeout=None):
+        await self.__acquire(self.getters, self.not_empty, self.__has_items, block, timeout, Empty)
+        try:
+            yield
+            self.num_items -= 1
+            self.__wake(self.putters, self.not_full)
+        finally:
+            self.mutex.release()
+
+    def __wait_sync(self, condition, ready, block, timeout, exception):
+        """ the thread-side wait, identical to ThreadSafetyWrapper's; must be called w/ the
+        mutex held. """
+        if ready():
+            return
+        if self.closed:
+            raise Closed
+        if not block:
+            raise exception
+        end_time = None if timeout is None else monotonic() + timeout
+        while not ready():
+            if end_time is None:
+                condition.wait()
+            else:
+                remaining = end_time - monotonic()
+                if remaining <= 0:
+                    raise exception
+                condition.wait(remaining)
+            if self.closed and not ready():
+                raise Closed
+
+    """ thread-side counterparts of protect_put()/protect_get(), for the *_sync methods.
+    They mustn't block on the event loop's own thread. """
+    @contextmanager
+    def protect_put_sync(self, block=True, timeout=None):
+        with self.mutex:
+            if self.closed:
+                raise Closed
+            self.__wait_sync(self.not_full, self.__has_space, block, timeout, Full)
+            yield
+            self.num_items += 1
+            self.__wake(self.getters, self.not_empty)
+
+    @contextmanager
+    def protect_get_sync(self, block=True, timeout=None):
+        with self.mutex:
+            self.__wait_sync(self.not_empty, self.__has_items, block, timeout, Empty)
+            yield
+            self.num_items -= 1
+            self.__wake(self.putters, self.not_full)
+
+    def close(self):
+        """ as ThreadSafetyWrapper.close(); may be called from any thread. """
+        with self.mutex:
+            self.closed = True
+            self.__wake(self.getters, self.not_empty, len(self.getters))
+            self.__wake(self.putters, self.not_full, len(self.putters))
+            self.not_empty.notify_all()
+            self.not_full.notify_all()
@@ -0,0 +1,31 @@
+from collections import deque
+
+from async_safety_wrapper import AsyncSafetyWrapper
+
+""" the asyncio version of Stack; see AsyncQueue for the *_sync bridge methods. """
+class AsyncStack(AsyncSafetyWrapper):
+    def __init__(self, maxsize=None):
+        self.stack = deque()
+        super().__init__(maxsize)
+
+    async def push(self, item, block=True, timeout=None):
+        async with self.protect_put(block, timeout):
+            self.stack.append(item)
+
+    async def pop(self, block=True, timeout=None):
+        async with self.protect_get(block, timeout):
+            return self.stack.pop()
+
+    def push_sync(self, item, block=True, timeout=None):
+        with self.protect_put_sync(block, timeout):
+            self.stack.append(item)
+
+    def pop_sync(self, block=True, timeout=None):
+        with self.protect_get_sync(block, timeout):
+            return self.stack.pop()
+
+    def empty(self):
+        return len(self.stack) == 0
+
+    def size(self):
+        return len(self.stack)
@@ -0,0 +1,61 @@
+""" measure producer/consumer throughput against batch size, run w/ `python batch_benchmarks.py [num_items]`. One producer
+thread puts num_items items into a container bounded at 1024 items while the main thread takes them out, either one call
+per item (batch size "single") or w/ the *_many() methods in batches of the given size (the consumer takes up to that
+many per call). Reported in items per second, as the best of 3 runs. """
+from time import perf_counter
+import sys
+import threading
+
+from priority_queue import PriorityQueue
+from queue import Queue
+from stack import Stack
+
+
+CONTAINERS = {
+    "Queue": (Queue, "enqueue", "dequeue", "enqueue_many", "dequeue_many"),
+    "PriorityQueue": (PriorityQueue, "enqueue", "dequeue", "enqueue_many", "dequeue_many"),
+    "Stack": (Stack, "push", "pop", "push_many", "pop_many"),
+}
+BATCH_SIZES = (None, 1, 10, 100, 1000)
+MAXSIZE = 1024
+
+
+def producer(put, items, batch_size):
+    if batch_size is None:
+        for item in items:
+            put(item)
+    else:
+        for start in range(0, len(items), batch_size):
+            put(items[start:start + batch_size])
+
+def throughput(factory, names, num_items, batch_size):
+    container = factory(MAXSIZE)
+    put_name, get_name, put_many_name, get_many_name = names
+    items = list(range(num_items))
+    if batch_size is None:
+        put, get = getattr(container, put_name), getattr(container, get_name)
+    else:
+        put, get = getattr(container, put_many_name), getattr(container, get_many_name)
+    thread = threading.Thread(target=producer, args=(put, items, batch_size))
+    start = perf_counter()
+    thread.start()
+    if batch_size is None:
+        for _ in range(num_items):
+            get()
+    else:
+        received = 0
+        while received < num_items:
+            received += len(get(batch_size))
+    thread.join()
+    return num_items / (perf_counter() - start)
+
+def benchmark(num_items=200000):
+    print(f"{'container':<16}{'batch size':>11}{'items/s':>13}")
+    for name, (factory, *names) in CONTAINERS.items():
+        for batch_size in BATCH_SIZES:
+            rate = max(throughput(factory, names, num_items, batch_size) for _ in range(3))
+            print(f"{name:<16}{batch_size or 'single':>11}{rate:>13,.0f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,88 @@
+""" measure Queue under contention, run w/ `python contention_benchmarks.py [num_items]`. num_items items are split evenly
+between P producer threads and C consumer threads, unbounded and w/ a small maxsize (so that producers keep blocking on
+consumers and vice versa). Queue's single-mutex/condition core is compared against SemaphoreQueue, a copy of the
+semaphore-pair design it replaced. Reported in microseconds per item, as the best of 3 runs. """
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+import sys
+import threading
+
+from queue import Queue
+
+
+class SemaphoreQueue:
+    """ the baseline, as Queue was before: one Semaphore counting items and one counting free space, acquired and released
+    in protect_put()/protect_get() context managers around an unlocked deque.append()/popleft(). """
+    def __init__(self, maxsize=None):
+        self.queue = deque()
+        self.count = threading.Semaphore(0)
+        self.space = threading.Semaphore(maxsize) if maxsize else None
+
+    @contextmanager
+    def protect_put(self):
+        if self.space:
+            self.space.acquire()
+        yield
+        self.count.release()
+
+    @contextmanager
+    def protect_get(self):
+        self.count.acquire()
+        yield
+        if self.space:
+            self.space.release()
+
+    def enqueue(self, item):
+        with self.protect_put():
+            self.queue.append(item)
+
+    def dequeue(self):
+        with self.protect_get():
+            return self.queue.popleft()
+
+
+QUEUES = {
+    "Queue": Queue,
+    "SemaphoreQueue": SemaphoreQueue,
+}
+""" (producers, consumers, maxsize) """
+SCENARIOS = ((1, 1, None), (1, 1, 16), (4, 4, 16), (8, 8, 4))
+
+
+def producer(queue, num_items):
+    enqueue = queue.enqueue
+    for item in range(num_items):
+        enqueue(item)
+
+def consumer(queue, num_items):
+    dequeue = queue.dequeue
+    for _ in range(num_items):
+        dequeue()
+
+def time_per_item(factory, num_producers, num_consumers, maxsize, num_items):
+    queue = factory(maxsize)
+    threads = [threading.Thread(target=producer, args=(queue, num_items // num_producers))
+               for _ in range(num_producers)]
+    threads += [threading.Thread(target=consumer, args=(queue, num_items // num_consumers))
+                for _ in range(num_consumers)]
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (perf_counter() - start) / num_items * 1e6
+
+def benchmark(num_items=200000):
+    """ round num_items down so that it splits evenly between every scenario's producers and consumers. """
+    num_items -= num_items % 8
+    print(f"{'scenario':<22}" + "".join(f"{name:>16}" for name in QUEUES))
+    for num_producers, num_consumers, maxsize in SCENARIOS:
+        scenario = f"{num_producers}P/{num_consumers}C " + (f"maxsize {maxsize}" if maxsize else "unbounded")
+        times = [min(time_per_item(factory, num_producers, num_consumers, maxsize, num_items) for _ in range(3))
+                 for factory in QUEUES.values()]
+        print(f"{scenario:<22}" + "".join(f"{time:>16.2f}" for time in times))
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,139 @@
+from contextlib import contextmanager
+from itertools import count
+from math import inf
+from time import monotonic
+import threading
+
+from priority_queue import PriorityQueue
+from thread_safety_wrapper import Empty, Closed
+
+
+""" sequence numbers are shared by every DelayQueue, so they stay unique when queues are merged. """
+SEQUENCE = count()
+
+
+""" a queue whose items only become available once their delay has passed. Items are kept in
+PriorityQueue's heap as (deadline, sequence number, item) entries, so the head is always the
+next item due, and items w/ the same deadline leave in the order they were enqueued.
+
+A blocked consumer waits on the not_empty condition w/ a timeout that ends exactly at the
+head's deadline, rather than polling. To keep hundreds of thousands of pending items cheap,
+only one waiting consumer (the 'leader') times its wait to the head; the others wait
+untimed until the leader takes the head and hands the role on, or until an item due earlier
+than the head is enqueued, which resets the leader. """
+class DelayQueue(PriorityQueue):
+    """ enqueue_many() takes (item, delay) pairs but dequeue_many() returns the bare items, so
+    only single enqueues/dequeues sample dwell times. """
+    DWELL_METHODS = (("enqueue", "dequeue", False),)
+
+    def __init__(self, maxsize=None, backend="binary", arity=4):
+        self.leader = None
+        super().__init__(maxsize, backend, arity)
+
+    def __push(self, item, delay):
+        entry = (monotonic() + delay, next(SEQUENCE), item)
+        self.queue.push(entry)
+        """ a new head invalidates the leader's timed wait; protect_put() then notifies a
+        consumer, which becomes the new leader. """
+        if self.queue.peek() is entry:
+            self.leader = None
+
+    def enqueue(self, item, delay=0, block=True, timeout=None):
+        """ enqueue an item that becomes available to dequeue after 'delay' seconds. """
+        with self.protect_put(block, timeout):
+            self.__push(item, delay)
+
+    def dequeue(self, block=True, timeout=None):
+        """ remove and return the item whose deadline passed first, waiting (if block is True)
+        until one is due. """
+        with self.protect_get(block, timeout):
+            return self.queue.pop()[2]
+
+    def enqueue_many(self, items, block=True, timeout=None):
+        """ see Queue.enqueue_many(); 'items' are (item, delay) pairs. """
+        items = list(items)
+        start = 0
+        while start < len(items):
+            with self.protect_put_many(len(items) - start, block, timeout) as num_items:
+                for item, delay in items[start:start + num_items]:
+                    self.__push(item, delay)
+            start += num_items
+
+    def dequeue_many(self, max_items, block=True, timeout=None):
+        """ wait for at least one item to be due, then dequeue up to max_items of those due,
+        earliest deadline first. """
+        with self.protect_get_many(max_items, block, timeout) as num_items:
+            pop = self.queue.pop
+            return [pop()[2] for _ in range(num_items)]
+
+    def __wait_until_due(self, block, timeout):
+        """ the deadline-aware counterpart of ThreadSafetyWrapper's wait; must be called w/
+        the mutex held. Raise Empty if no item is due in time (straight away if block is
+        False), or Closed if the queue is closed and empty. """
+        if timeout is not None and timeout < 0:
+            raise ValueError("'timeout' must be a non-negative number.")
+        end_time = None if timeout is None else monotonic() + timeout
+        current = threading.get_ident()
+        while True:
+            now = monotonic()
+            if self.queue and self.queue.peek()[0] <= now:
+                return
+            if self.closed and not self.queue:
+                raise Closed
+            if not block:
+                raise Empty
+            remaining = None if end_time is None else end_time - now
+            if remaining is not None and remaining <= 0:
+                raise Empty
+            if self.queue and self.leader is None:
+                self.leader = current
+                delay = self.queue.peek()[0] - now
+                try:
+                    self.not_empty.wait(delay if remaining is None else min(delay, remaining))
+                finally:
+                    if self.leader == current:
+                        self.leader = None
+            else:
+                self.not_empty.wait(remaining)
+
+    def __hand_over(self):
+        """ after taking items, wake a follower to lead the wait for the new head. """
+        if self.leader is None and self.queue:
+            self.not_empty.notify()
+
+    """ PriorityQueue's gets, waiting for a due item rather than any item. """
+    @contextmanager
+    def protect_get(self, block=True, timeout=None):
+        with self.mutex:
+            try:
+                self.__wait_until_due(block, timeout)
+                yield
+                self.num_items -= 1
+                self.not_full.notify()
+            finally:
+                self.__hand_over()
+
+    @contextmanager
+    def protect_get_many(self, max_items, block=True, timeout=None):
+        with self.mutex:
+            try:
+                self.__wait_until_due(block, timeout)
+                """ entries w/ a deadline of at most 'now' are exactly those that compare below 
+                (now, inf), as every sequence number is less than inf (so items are never 
+                compared). """
+                acquired = self.queue.count_below((monotonic(), inf), max_items)
+                yield acquired
+                self.num_items -= acquired
+                self.not_full.notify(acquired)
+            finally:
+                self.__hand_over()
+
+    def merge(self, other):
+        """ only another DelayQueue holds (deadline, sequence number, item) entries, so only one
+        can be merged in. The leader is reset, as the head may have changed. """
+        if not isinstance(other, DelayQueue):
+            raise ValueError("Can only merge a DelayQueue into a DelayQueue.")
+        super().merge(other)
+        with self.mutex:
+            self.leader = None
+            self.not_empty.notify()
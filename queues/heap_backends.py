@@ -0,0 +1,185 @@
+from heapq import heapify, heappush, heappop
+
+""" interchangeable min-heaps for PriorityQueue. Each provides push(), pop(), peek(), meld()
+(move every item of another heap of the same kind into this one, emptying it),
+count_below() and __len__(). None of them are thread safe by themselves. """
+
+def count_array_below(heap, arity, bound, limit):
+    """ count the items < bound in an array heap, stopping at limit. The items < bound form a
+    subtree containing the root (as no child is smaller than its parent), so only that
+    subtree and its boundary are visited: O(limit * arity), not O(n). """
+    found = 0
+    stack = [0] if heap else []
+    while stack and found < limit:
+        position = stack.pop()
+        if heap[position] < bound:
+            found += 1
+            stack.extend(range(arity * position + 1, min(arity * position + arity + 1, len(heap))))
+    return found
+
+class BinaryHeap:
+    """ the standard library's binary heap; heapq is implemented in C, so this is usually
+    the fastest in CPython. """
+    def __init__(self):
+        self.heap = []
+
+    def push(self, item):
+        heappush(self.heap, item)
+
+    def pop(self):
+        return heappop(self.heap)
+
+    def peek(self):
+        return self.heap[0]
+
+    def meld(self, other):
+        """ O(n + m): concatenate the two arrays and re-heapify. """
+        self.heap.extend(other.heap)
+        other.heap = []
+        heapify(self.heap)
+
+    def count_below(self, bound, limit):
+        return count_array_below(self.heap, 2, bound, limit)
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class DaryHeap:
+    """ a heap in which every parent has up to 'arity' children, stored in one array; a
+    node's children are at arity * i + 1 ... arity * i + arity. The tree is log2(arity) times
+    shallower than a binary heap, so a push sifts up through fewer levels, while a pop
+    compares more children per level on the way down. """
+    def __init__(self, arity=4):
+        if arity < 2:
+            raise ValueError("'arity' must be at least 2.")
+        self.arity = arity
+        self.heap = []
+
+    """ sifting moves the displaced item along the path and writes it once at the end, rather
+    than swapping at every level. """
+    def __sift_up(self, position):
+        heap = self.heap
+        item = heap[position]
+        while position > 0:
+            parent = (position - 1) // self.arity
+            if not item < heap[parent]:
+                break
+            heap[position] = heap[parent]
+            position = parent
+        heap[position] = item
+
+    def __sift_down(self, position):
+        heap = self.heap
+        size = len(heap)
+        item = heap[position]
+        while True:
+            first = self.arity * position + 1
+            if first >= size:
+                break
+            smallest = first
+            for child in range(first + 1, min(first + self.arity, size)):
+                if heap[child] < heap[smallest]:
+                    smallest = child
+            if not heap[smallest] < item:
+                break
+            heap[position] = heap[smallest]
+            position = smallest
+        heap[position] = item
+
+    def push(self, item):
+        self.heap.append(item)
+        self.__sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        heap = self.heap
+        last = heap.pop()
+        if not heap:
+            return last
+        smallest = heap[0]
+        heap[0] = last
+        self.__sift_down(0)
+        return smallest
+
+    def peek(self):
+        return self.heap[0]
+
+    def meld(self, other):
+        """ O(n + m): concatenate the two arrays and sift down every parent, last first. """
+        self.heap.extend(other.heap)
+        other.heap = []
+        for position in range((len(self.heap) - 2) // self.arity, -1, -1):
+            self.__sift_down(position)
+
+    def count_below(self, bound, limit):
+        return count_array_below(self.heap, self.arity, bound, limit)
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class PairingHeap:
+    """ a heap-ordered tree in which each node is an [item, children] list. push() and meld()
+    are O(1): they only link two roots, making the larger a child of the smaller. The work
+    is deferred to pop(), which combines the root's children in two passes, for an O(log n)
+    amortised cost. """
+    def __init__(self):
+        self.root = None
+        self.size = 0
+
+    @staticmethod
+    def __link(first, second):
+        if second[0] < first[0]:
+            first, second = second, first
+        first[1].append(second)
+        return first
+
+    def push(self, item):
+        node = [item, []]
+        self.root = node if self.root is None else self.__link(self.root, node)
+        self.size += 1
+
+    def pop(self):
+        if self.root is None:
+            raise IndexError("pop from an empty heap")
+        item, children = self.root
+        """ first pass: link the children in pairs, left to right; second pass: link the
+        resulting trees into one, right to left. """
+        paired = [self.__link(children[i], children[i + 1]) if i + 1 < len(children) else children[i]
+                  for i in range(0, len(children), 2)]
+        root = paired.pop() if paired else None
+        while paired:
+            root = self.__link(paired.pop(), root)
+        self.root = root
+        self.size -= 1
+        return item
+
+    def peek(self):
+        if self.root is None:
+            raise IndexError("peek at an empty heap")
+        return self.root[0]
+
+    def meld(self, other):
+        """ O(1): link the two roots. """
+        if other.root is not None:
+            self.root = other.root if self.root is None else self.__link(self.root, other.root)
+        self.size += other.size
+        other.root = None
+        other.size = 0
+
+    def count_below(self, bound, limit):
+        """ as count_array_below(), walking the tree instead. """
+        found = 0
+        stack = [] if self.root is None else [self.root]
+        while stack and found < limit:
+            node = stack.pop()
+            if node[0] < bound:
+                found += 1
+                stack.extend(node[1])
+        return found
+
+    def __len__(self):
+        return self.size
+
+
+BACKENDS = {"binary": BinaryHeap, "dary": DaryHeap, "pairing": PairingHeap}
@@ -0,0 +1,89 @@
+""" compare PriorityQueue's heap backends on three traces, run w/ `python heap_benchmarks.py [num_items]`:
+    push-heavy: a burst of pushes, then a drain (every push, then every pop).
+    pop-heavy:  a full heap of num_items items is drained, refilling one item per 4 pops.
+    mixed:      a heap of num_items / 10 items under random interleaved pushes and pops.
+Each trace is run directly against the heap (the cost of the backend itself) and through PriorityQueue.enqueue()/
+dequeue() (including the mutex), and is reported as the best of 3 runs. """
+from random import Random
+from time import perf_counter
+import sys
+
+from heap_backends import BinaryHeap, DaryHeap, PairingHeap
+from priority_queue import PriorityQueue
+
+
+HEAPS = {
+    "binary": BinaryHeap,
+    "dary (arity 4)": lambda: DaryHeap(4),
+    "dary (arity 8)": lambda: DaryHeap(8),
+    "pairing": PairingHeap,
+}
+QUEUES = {
+    "binary": lambda: PriorityQueue(backend="binary"),
+    "dary (arity 4)": lambda: PriorityQueue(backend="dary", arity=4),
+    "dary (arity 8)": lambda: PriorityQueue(backend="dary", arity=8),
+    "pairing": lambda: PriorityQueue(backend="pairing"),
+}
+
+
+""" each trace is a list of operations: a (priority, sequence number) item to push, or None to pop. """
+def push_heavy(num_items, rng):
+    return [(rng.random(), i) for i in range(num_items)] + [None] * num_items
+
+def pop_heavy(num_items, rng):
+    trace = [(rng.random(), i) for i in range(num_items)]
+    for i in range(num_items):
+        trace.append(None)
+        if i % 4 == 0:
+            trace.append((rng.random(), num_items + i))
+    return trace
+
+def mixed(num_items, rng):
+    trace = [(rng.random(), i) for i in range(num_items // 10)]
+    size = len(trace)
+    for i in range(num_items):
+        if size and rng.random() < 0.5:
+            trace.append(None)
+            size -= 1
+        else:
+            trace.append((rng.random(), i))
+            size += 1
+    return trace
+
+TRACES = {"push-heavy": push_heavy, "pop-heavy": pop_heavy, "mixed": mixed}
+
+
+def run_heap(factory, trace):
+    heap = factory()
+    push, pop = heap.push, heap.pop
+    start = perf_counter()
+    for item in trace:
+        if item is None:
+            pop()
+        else:
+            push(item)
+    return perf_counter() - start
+
+def run_queue(factory, trace):
+    queue = factory()
+    enqueue, dequeue = queue.enqueue, queue.dequeue
+    start = perf_counter()
+    for item in trace:
+        if item is None:
+            dequeue()
+        else:
+            enqueue(item)
+    return perf_counter() - start
+
+def benchmark(num_items=100000):
+    print(f"{'trace':<12}{'backend':<16}{'heap (s)':>10}{'queue (s)':>11}")
+    for trace_name, make_trace in TRACES.items():
+        trace = make_trace(num_items, Random(0))
+        for backend in HEAPS:
+            heap_time = min(run_heap(HEAPS[backend], trace) for _ in range(3))
+            queue_time = min(run_queue(QUEUES[backend], trace) for _ in range(3))
+            print(f"{trace_name:<12}{backend:<16}{heap_time:>10.3f}{queue_time:>11.3f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
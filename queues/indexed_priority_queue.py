@@ -0,0 +1,145 @@
+from itertools import count
+
+from thread_safety_wrapper import ThreadSafetyWrapper, Empty
+
+""" a priority queue whose queued items can be re-prioritised or removed in place. Every
+enqueue() returns a handle, and a map from handles to heap positions lets update_priority()
+and remove() find the item's entry and sift it up or down in O(log n), instead of leaving a
+stale entry in the heap for dequeue() to skip later. Items of equal priority are dequeued
+in the order they were enqueued. """
+class IndexedPriorityQueue(ThreadSafetyWrapper):
+    """ dequeue() returns (priority, item) pairs rather than the enqueued items, so dwell times 
+    aren't sampled. """
+    DWELL_METHODS = ()
+
+    def __init__(self, maxsize=None):
+        """ each heap entry is a [priority, sequence number, handle, item] list. Sequence
+        numbers are unique and increase w/ every enqueue, so comparing two entries (as lists)
+        orders them by priority, then by insertion order, and never compares the items
+        themselves. 'positions' maps each queued handle to its entry's index in the heap. """
+        self.queue = []
+        self.positions = {}
+        self.sequence = count()
+        self.handles = count()
+        super().__init__(maxsize)
+
+    def __swap(self, i, j):
+        queue = self.queue
+        queue[i], queue[j] = queue[j], queue[i]
+        self.positions[queue[i][2]] = i
+        self.positions[queue[j][2]] = j
+
+    def __sift_up(self, position):
+        queue = self.queue
+        while position > 0:
+            parent = (position - 1) >> 1
+            if not queue[position] < queue[parent]:
+                break
+            self.__swap(position, parent)
+            position = parent
+
+    def __sift_down(self, position):
+        queue = self.queue
+        size = len(queue)
+        while True:
+            smallest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and queue[child] < queue[smallest]:
+                    smallest = child
+            if smallest == position:
+                return
+            self.__swap(position, smallest)
+            position = smallest
+
+    def __push(self, item, priority):
+        handle = next(self.handles)
+        self.positions[handle] = len(self.queue)
+        self.queue.append([priority, next(self.sequence), handle, item])
+        self.__sift_up(len(self.queue) - 1)
+        return handle
+
+    def __pop(self, position):
+        """ remove and return the entry at 'position' by moving the last entry into its place
+        and sifting that up or down, whichever restores the heap invariant. """
+        queue = self.queue
+        last = len(queue) - 1
+        if position != last:
+            self.__swap(position, last)
+        entry = queue.pop()
+        del self.positions[entry[2]]
+        if position < len(queue):
+            self.__sift_up(position)
+            self.__sift_down(position)
+        return entry
+
+    def enqueue(self, item, priority, block=True, timeout=None):
+        """ return the handle used to update or remove this item while it's queued. """
+        with self.protect_put(block, timeout):
+            return self.__push(item, priority)
+
+    def dequeue(self, block=True, timeout=None):
+        """ remove and return the (priority, item) pair w/ the smallest priority. """
+        with self.protect_get(block, timeout):
+            priority, _, _, item = self.__pop(0)
+            return priority, item
+
+    def enqueue_many(self, items, block=True, timeout=None):
+        """ see Queue.enqueue_many(); 'items' are (item, priority) pairs, and a list of their
+        handles is returned. """
+        items = list(items)
+        handles = []
+        while len(handles) < len(items):
+            start = len(handles)
+            with self.protect_put_many(len(items) - start, block, timeout) as num_items:
+                for item, priority in items[start:start + num_items]:
+                    handles.append(self.__push(item, priority))
+        return handles
+
+    def dequeue_many(self, max_items, block=True, timeout=None):
+        """ wait for at least one item, then pop up to max_items (priority, item) pairs,
+        smallest first. """
+        with self.protect_get_many(max_items, block, timeout) as num_items:
+            return [(entry[0], entry[3]) for entry in (self.__pop(0) for _ in range(num_items))]
+
+    def peek(self):
+        """ return the (priority, item) pair that dequeue() would return, without removing it;
+        raise Empty if the queue is empty. """
+        with self.mutex:
+            if not self.queue:
+                raise Empty
+            priority, _, _, item = self.queue[0]
+            return priority, item
+
+    def update_priority(self, handle, priority):
+        """ change the priority of a queued item, keeping its original place among items of
+        equal priority. Raise KeyError if the handle's item has already left the queue. """
+        with self.mutex:
+            position = self.positions[handle]
+            entry = self.queue[position]
+            old_priority = entry[0]
+            entry[0] = priority
+            if priority < old_priority:
+                self.__sift_up(position)
+            else:
+                self.__sift_down(position)
+
+    def remove(self, handle):
+        """ remove a queued item and return it. Raise KeyError if the handle's item has
+        already left the queue. A removed item counts as done for join(). """
+        with self.mutex:
+            entry = self.__pop(self.positions[handle])
+            self.num_items -= 1
+            self.unfinished_tasks -= 1
+            if self.unfinished_tasks == 0:
+                self.all_tasks_done.notify_all()
+            self.not_full.notify()
+            return entry[3]
+
+    def __contains__(self, handle):
+        return handle in self.positions
+
+    def empty(self):
+        return len(self.queue) == 0
+
+    def qsize(self):
+        return len(self.queue)
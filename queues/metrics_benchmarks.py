@@ -0,0 +1,58 @@
+""" measure the cost of queue metrics, run w/ `python metrics_benchmarks.py [num_items]`. Each container is timed putting
+then getting num_items items (single and batched calls) in three states: never instrumented, instrumented and then disabled
+(which should match the first, as disable_metrics() restores the class's own methods), and instrumented. Times are the best
+of 5 runs, in nanoseconds per item. """
+from time import perf_counter
+import sys
+
+from priority_queue import PriorityQueue
+from queue import Queue
+from stack import Stack
+
+
+CONTAINERS = {
+    "Queue": (Queue, "enqueue", "dequeue", "enqueue_many", "dequeue_many"),
+    "PriorityQueue": (PriorityQueue, "enqueue", "dequeue", "enqueue_many", "dequeue_many"),
+    "Stack": (Stack, "push", "pop", "push_many", "pop_many"),
+}
+
+
+def run(container, put_name, get_name, num_items):
+    put, get = getattr(container, put_name), getattr(container, get_name)
+    start = perf_counter()
+    for item in range(num_items):
+        put(item)
+    for _ in range(num_items):
+        get()
+    return perf_counter() - start
+
+def run_batched(container, put_name, get_name, num_items, batch_size=100):
+    put, get = getattr(container, put_name), getattr(container, get_name)
+    batch = list(range(batch_size))
+    start = perf_counter()
+    for _ in range(num_items // batch_size):
+        put(batch)
+    for _ in range(num_items // batch_size):
+        get(batch_size)
+    return perf_counter() - start
+
+def make(factory, state):
+    container = factory()
+    if state != "never":
+        container.enable_metrics()
+        if state == "disabled":
+            container.disable_metrics()
+    return container
+
+def benchmark(num_items=100000):
+    print(f"{'container':<15}{'calls':<9}{'never (ns)':>12}{'disabled (ns)':>15}{'enabled (ns)':>14}")
+    for name, (factory, put_name, get_name, put_many_name, get_many_name) in CONTAINERS.items():
+        for calls, runner, names in (("single", run, (put_name, get_name)),
+                                     ("batched", run_batched, (put_many_name, get_many_name))):
+            times = [min(runner(make(factory, state), *names, num_items) for _ in range(5)) / num_items * 1e9
+                     for state in ("never", "disabled", "enabled")]
+            print(f"{name:<15}{calls:<9}{times[0]:>12.0f}{times[1]:>15.0f}{times[2]:>14.0f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
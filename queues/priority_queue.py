@@ -1,27 +1,83 @@
-from heapq import heappush, heappop
+from heap_backends import BACKENDS, DaryHeap
+from thread_safety_wrapper import ThreadSafetyWrapper, Full
 
 """ a queue derivation in which elements have an associated priority to compare with others. 
 A sorted order is maintained to let new elements join where necessary while shuffling the existing 
-ones accordingly. When two elements are of equal priority, they’ll follow their insertion order. """
+ones accordingly. Items are compared as a whole, so two of equal priority are ordered by what 
+follows it (e.g. their data), and items that compare equal leave in no particular order: none 
+of the heap backends is stable, the pairing heap least of all. For first-in-first-out among 
+equal priorities, enqueue (priority, sequence number, data) items, as DelayQueue does, or use 
+IndexedPriorityQueue. """
 class PriorityQueue(ThreadSafetyWrapper):
-    def __init__(self, maxsize=None):
-        """ items are typically in the form (priority, data). """
-        self.queue = []
+    def __init__(self, maxsize=None, backend="binary", arity=4):
+        """ items are typically in the form (priority, data). 'backend' selects the heap 
+        holding them (see heap_backends): "binary" (heapq), "dary" (an 'arity'-ary heap) 
+        or "pairing" (a pairing heap, which melds in O(1)). """
+        if backend not in BACKENDS:
+            raise ValueError(f"'backend' must be one of {', '.join(BACKENDS)}.")
+        self.backend = backend
+        self.queue = DaryHeap(arity) if backend == "dary" else BACKENDS[backend]()
         super().__init__(maxsize)
 
-    def enqueue(self, item, block=True):
-        """ heapq.heappush/pop isn't thread safe. """
-        with self.protect_put(block), self.mutex:
-            """ heaps are binary trees for which every parent node has a value <= any of its 
-            children (refered to as the heap invariant); heapq.heappush() pushes an item 
-            onto the heap, maintaining the heap invariant. """
-            heappush(self.queue, item)
-
-    def dequeue(self, block=True):
-        with self.protect_get(block), self.mutex:
-            """ heapq.heappop() pops and returns the smallest item from the heap, maintaining 
+    def enqueue(self, item, block=True, timeout=None):
+        """ the heaps aren't thread safe, but the body of protect_put()/protect_get() 
+        runs while holding the mutex. """
+        with self.protect_put(block, timeout):
+            """ heaps are trees for which every parent node has a value <= any of its 
+            children (refered to as the heap invariant); push() adds an item to the heap, 
+            maintaining the heap invariant. """
+            self.queue.push(item)
+
+    def dequeue(self, block=True, timeout=None):
+        with self.protect_get(block, timeout):
+            """ pop() removes and returns the smallest item from the heap, maintaining 
             the heap invariant. """
-            return heappop(self.queue)
+            return self.queue.pop()
+
+    def enqueue_many(self, items, block=True, timeout=None):
+        """ see Queue.enqueue_many(); each batch is pushed onto the heap under one mutex 
+        acquisition. """
+        items = list(items)
+        start = 0
+        while start < len(items):
+            with self.protect_put_many(len(items) - start, block, timeout) as num_items:
+                push = self.queue.push
+                for item in items[start:start + num_items]:
+                    push(item)
+            start += num_items
+
+    def dequeue_many(self, max_items, block=True, timeout=None):
+        """ wait for at least one item, then pop up to max_items, smallest first. """
+        with self.protect_get_many(max_items, block, timeout) as num_items:
+            pop = self.queue.pop
+            return [pop() for _ in range(num_items)]
+
+    def merge(self, other):
+        """ move every item of another PriorityQueue w/ the same backend into this one, 
+        leaving the other queue empty; O(1) for the pairing backend, and O(n + m) for the 
+        others. It doesn't block: Full is raised (and nothing moved) if the items wouldn't 
+        fit within maxsize. Both mutexes are held throughout, always acquired in the same 
+        (id) order, so two threads merging a pair of queues in opposite directions can't 
+        deadlock. Moved items are accounted for as if dequeued from the other queue and 
+        enqueued into this one. """
+        if other is self:
+            raise ValueError("Can't merge a queue into itself.")
+        if other.backend != self.backend:
+            raise ValueError("Can only merge queues w/ the same backend.")
+        first, second = (self, other) if id(self) < id(other) else (other, self)
+        with first.mutex, second.mutex:
+            num_items = len(other.queue)
+            if self.maxsize and self.num_items + num_items > self.maxsize:
+                raise Full
+            self.queue.meld(other.queue)
+            self.num_items += num_items
+            self.unfinished_tasks += num_items
+            self.not_empty.notify(num_items)
+            other.num_items -= num_items
+            other.unfinished_tasks -= num_items
+            if other.unfinished_tasks == 0:
+                other.all_tasks_done.notify_all()
+            other.not_full.notify(num_items)
 
     def empty(self):
         return len(self.queue) == 0
@@ -1,5 +1,7 @@
 from collections import deque
 
+from thread_safety_wrapper import ThreadSafetyWrapper
+
 """ processes elements on a first-come, first-served basis. A new element is only allowed 
 to join the queue via the tail, while the oldest must leave from the head. This causes 
 all of its followers to shift one position towards the head. """
@@ -12,20 +14,40 @@ class Queue(ThreadSafetyWrapper):
         the superclass ThreadSafetyWrapper is executed when creating instances of Queue. """
         super().__init__(maxsize)
 
-    def enqueue(self, item, block=True):
+    def enqueue(self, item, block=True, timeout=None):
         """ with first calls the __enter__() method of the context manager to acquiring any necessary 
         resources. Once the context has been established, the associated block of code is executed. 
         After the block has been executed, (either successfully or due to an exception), 
         it calls __exit__() to release any acquired resources and perform cleanup operations. """
-        with self.protect_put(block):
+        with self.protect_put(block, timeout):
             """ deque.append() adds an item to the right end of the deque. """
             self.queue.append(item)
 
-    def dequeue(self, block=True):
-        with self.protect_get(block):
+    def dequeue(self, block=True, timeout=None):
+        with self.protect_get(block, timeout):
             """ dequeue.popleft() removes and returns the left-most item. """
             return self.queue.popleft()
 
+    def enqueue_many(self, items, block=True, timeout=None):
+        """ enqueue every item in order, a batch at a time: each pass claims as much free 
+        space as is available (blocking for at least one slot if block is True) and extends 
+        the deque with that many items under the mutex. If the queue stays full (past the 
+        timeout, or at all if block is False) part-way, Full is raised and the items already 
+        enqueued stay in the queue. """
+        items = list(items)
+        start = 0
+        while start < len(items):
+            with self.protect_put_many(len(items) - start, block, timeout) as num_items:
+                self.queue.extend(items[start:start + num_items])
+            start += num_items
+
+    def dequeue_many(self, max_items, block=True, timeout=None):
+        """ wait (up to timeout seconds, if given) for at least one item, then dequeue up 
+        to max_items of those available, oldest first. """
+        with self.protect_get_many(max_items, block, timeout) as num_items:
+            popleft = self.queue.popleft
+            return [popleft() for _ in range(num_items)]
+
     def empty(self):
         return len(self.queue) == 0
 
@@ -0,0 +1,166 @@
+from itertools import count
+from time import perf_counter
+import threading
+
+""" a histogram of durations w/ power-of-two microsecond buckets: bucket i counts durations
+under 2**i microseconds (and at least 2**(i - 1)), so recording one is a single
+int.bit_length(). """
+class LatencyHistogram:
+    NUM_BUCKETS = 40
+
+    def __init__(self):
+        self.counts = [0] * self.NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds):
+        self.counts[min(int(seconds * 1e6).bit_length(), self.NUM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, fraction):
+        """ the upper bound, in microseconds, of the bucket holding the given fraction (e.g.
+        0.99) of the recorded durations; 0 if nothing has been recorded. """
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return 2 ** bucket
+        return 0
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "p50_us": self.percentile(0.5),
+            "p99_us": self.percentile(0.99),
+            "buckets_us": {2 ** bucket: count for bucket, count in enumerate(self.counts) if count},
+        }
+
+
+""" metrics collected from one queue by ThreadSafetyWrapper.enable_metrics(). Everything but
+the dwell times is recorded while the queue's mutex is held, so no extra locking is needed
+on the hot path; a QueueMetrics object therefore mustn't be shared between queues.
+    enqueued/dequeued:        items put/got (batches count each item).
+    full/empty:               calls that gave up w/ Full/Empty.
+    put_blocked/get_blocked:  total seconds spent waiting for space/an item.
+    high_water_mark:          the largest number of items ever in the queue.
+    lock_wait/lock_hold:      histograms of time spent acquiring/holding the mutex, per call.
+    dwell:                    a histogram of enqueue-to-dequeue times of every
+                              'sample_every'-th enqueued item.
+If a callback is given, it's called w/ snapshot() at most every 'interval' seconds, from
+whichever thread completes an operation once the interval has passed.
+
+Metrics are only available on ThreadSafetyWrapper's containers (Queue, PriorityQueue,
+IndexedPriorityQueue, DelayQueue and Stack), as they hook its mutex and waits. The other
+queues have none: RingBufferQueue and WorkStealingDeque are lock-free, so there's no mutex
+to time and no lock under which to count for free; SharedMemoryQueue is shared between
+processes, so per-process counters wouldn't describe the queue; and the Async* queues wait
+on futures through AsyncSafetyWrapper, which has no instrumentation hooks. """
+class QueueMetrics:
+    def __init__(self, sample_every=64, callback=None, interval=1.0):
+        self.sample_every = sample_every
+        self.callback = callback
+        self.interval = interval
+        self.next_report = perf_counter() + interval
+        """ guards the dwell state and the rarely updated counters, which are recorded
+        outside the queue's mutex. """
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.enqueued = 0
+        self.dequeued = 0
+        self.full = 0
+        self.empty = 0
+        self.put_blocked = 0.0
+        self.get_blocked = 0.0
+        """ the time the current mutex holder spent blocked; see ThreadSafetyWrapper. """
+        self.blocked = 0.0
+        self.high_water_mark = 0
+        self.lock_wait = LatencyHistogram()
+        self.lock_hold = LatencyHistogram()
+        self.dwell = LatencyHistogram()
+        """ maps id() of each sampled item still in the queue to the times it was enqueued.
+        The queue holds a reference to the item, so its id can't be reused meanwhile. """
+        self.enqueue_times = {}
+        """ next() on an itertools.count is atomic, so puts are counted for sampling w/o a
+        lock. """
+        self.num_puts = count(1)
+
+    def snapshot(self):
+        return {
+            "enqueued": self.enqueued,
+            "dequeued": self.dequeued,
+            "full": self.full,
+            "empty": self.empty,
+            "put_blocked_s": self.put_blocked,
+            "get_blocked_s": self.get_blocked,
+            "high_water_mark": self.high_water_mark,
+            "lock_wait": self.lock_wait.snapshot(),
+            "lock_hold": self.lock_hold.snapshot(),
+            "dwell": self.dwell.snapshot(),
+        }
+
+    def maybe_report(self, now):
+        """ call the callback if the interval has passed, w/o blocking on another thread
+        that's already doing so. """
+        if self.callback is None or now < self.next_report or not self.lock.acquire(False):
+            return
+        try:
+            self.next_report = now + self.interval
+        finally:
+            self.lock.release()
+        self.callback(self.snapshot())
+
+    def record_failure(self, put):
+        with self.lock:
+            if put:
+                self.full += 1
+            else:
+                self.empty += 1
+
+    """ dwell sampling wraps the container's own put/get methods, as only they see the items.
+    Batch methods sample and match each item of the batch. A sampled item's enqueue time is
+    noted before it's put, so a consumer can't take it before it's been noted. """
+    def track_put(self, method, many=False):
+        def put(items, *args, **kwargs):
+            if many:
+                items = list(items)
+            sampled = [item for item in (items if many else (items,))
+                       if next(self.num_puts) % self.sample_every == 0]
+            if not sampled:
+                return method(items, *args, **kwargs)
+            now = perf_counter()
+            with self.lock:
+                for item in sampled:
+                    self.enqueue_times.setdefault(id(item), []).append(now)
+            try:
+                return method(items, *args, **kwargs)
+            except BaseException:
+                """ forget the enqueue times of items that didn't make it into the queue. """
+                with self.lock:
+                    for item in sampled:
+                        times = self.enqueue_times.get(id(item))
+                        if times and now in times:
+                            times.remove(now)
+                            if not times:
+                                del self.enqueue_times[id(item)]
+                raise
+        return put
+
+    def track_get(self, method, many=False):
+        def get(*args, **kwargs):
+            result = method(*args, **kwargs)
+            if self.enqueue_times:
+                now = perf_counter()
+                with self.lock:
+                    for item in (result if many else (result,)):
+                        times = self.enqueue_times.get(id(item))
+                        if times:
+                            self.dwell.record(now - times.pop(0))
+                            if not times:
+                                del self.enqueue_times[id(item)]
+            return result
+        return get
@@ -0,0 +1,65 @@
+from time import monotonic, sleep
+import threading
+
+from thread_safety_wrapper import Empty
+
+""" wraps any queue (anything w/ enqueue()/dequeue()/qsize()/empty(), e.g. Queue, PriorityQueue
+or DelayQueue) so that items are dequeued at no more than 'rate' per second, w/ bursts of up
+to 'burst' items after an idle spell. This is a token bucket: tokens accrue at 'rate' per
+second up to 'burst', and each dequeue spends one.
+
+Rather than polling for a token, each dequeue reserves the next one under a lock, which may
+take the bucket below zero, and sleeps until exactly when that token accrues; concurrent
+consumers therefore queue up one token interval apart. A reservation that couldn't be met
+within the timeout isn't made, and one whose item doesn't arrive in time is handed back. """
+class RateLimitedQueue:
+    def __init__(self, queue, rate, burst=1):
+        if rate <= 0 or burst < 1:
+            raise ValueError("'rate' must be positive and 'burst' at least 1.")
+        self.queue = queue
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = monotonic()
+        self.lock = threading.Lock()
+
+    def __reserve(self, block, timeout):
+        """ spend a token and return how long to wait until it's accrued; raise Empty (and
+        spend nothing) if that's not allowed. """
+        with self.lock:
+            now = monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+            if wait and (not block or (timeout is not None and wait > timeout)):
+                raise Empty
+            self.tokens -= 1
+            return wait
+
+    def __refund(self):
+        with self.lock:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+    def enqueue(self, *args, **kwargs):
+        """ enqueuing isn't limited; the arguments are passed on to the wrapped queue. """
+        return self.queue.enqueue(*args, **kwargs)
+
+    def dequeue(self, block=True, timeout=None):
+        """ wait for a token, then dequeue from the wrapped queue w/ whatever is left of the
+        timeout. """
+        start = monotonic()
+        wait = self.__reserve(block, timeout)
+        if wait:
+            sleep(wait)
+        remaining = None if timeout is None else max(timeout - (monotonic() - start), 0)
+        try:
+            return self.queue.dequeue(block, remaining)
+        except BaseException:
+            self.__refund()
+            raise
+
+    def empty(self):
+        return self.queue.empty()
+
+    def qsize(self):
+        return self.queue.qsize()
@@ -0,0 +1,72 @@
+""" compare RingBufferQueue against Queue(maxsize) in a two-thread pipeline, run w/
+`python ring_buffer_benchmarks.py [num_items]`:
+    throughput: one producer thread enqueues num_items items as fast as it can while one consumer thread dequeues them,
+                for queues of 64 and 1024 slots; reported in items per second, as the best of 3 runs.
+    latency:    the producer enqueues a timestamp every 20 us or so, and the consumer records how long each took to
+                arrive; reported as the median and 99th percentile, in microseconds.
+RingBufferQueue is run in both single-producer (SPSC) and multi-producer (MPSC) mode, the latter w/ a single producer, so
+it shows the cost of the producer lock alone. """
+from time import perf_counter, sleep
+import sys
+import threading
+
+from queue import Queue
+from ring_buffer_queue import RingBufferQueue
+
+
+QUEUES = {
+    "SPSC": lambda capacity: RingBufferQueue(capacity),
+    "MPSC": lambda capacity: RingBufferQueue(capacity, multi_producer=True),
+    "Queue(maxsize)": lambda capacity: Queue(maxsize=capacity),
+}
+
+
+def producer(queue, items):
+    enqueue = queue.enqueue
+    for item in items:
+        enqueue(item)
+
+def throughput(factory, capacity, num_items):
+    queue = factory(capacity)
+    thread = threading.Thread(target=producer, args=(queue, range(num_items)))
+    dequeue = queue.dequeue
+    start = perf_counter()
+    thread.start()
+    for _ in range(num_items):
+        dequeue()
+    thread.join()
+    return num_items / (perf_counter() - start)
+
+def paced_producer(queue, num_items, interval):
+    enqueue = queue.enqueue
+    for _ in range(num_items):
+        enqueue(perf_counter())
+        sleep(interval)
+
+def latency(factory, capacity, num_items, interval=0.00002):
+    queue = factory(capacity)
+    thread = threading.Thread(target=paced_producer, args=(queue, num_items, interval))
+    dequeue = queue.dequeue
+    latencies = []
+    thread.start()
+    for _ in range(num_items):
+        sent = dequeue()
+        latencies.append(perf_counter() - sent)
+    thread.join()
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6
+
+def benchmark(num_items=300000):
+    print(f"{'queue':<16}{'capacity':>9}{'items/s':>12}")
+    for capacity in (64, 1024):
+        for name, factory in QUEUES.items():
+            rate = max(throughput(factory, capacity, num_items) for _ in range(3))
+            print(f"{name:<16}{capacity:>9}{rate:>12,.0f}")
+    print(f"\n{'queue':<16}{'p50 (us)':>9}{'p99 (us)':>10}")
+    for name, factory in QUEUES.items():
+        p50, p99 = latency(factory, 1024, min(num_items, 20000))
+        print(f"{name:<16}{p50:>9.1f}{p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 300000)
@@ -0,0 +1,104 @@
+from time import monotonic, sleep
+import threading
+
+from thread_safety_wrapper import Empty, Full
+
+""" a bounded FIFO queue over a preallocated ring buffer, for pipeline stages w/ a single
+consumer. The capacity is rounded up to a power of two, so a slot is found by masking an
+ever-increasing counter rather than wrapping it. Only the producer writes 'tail' and only
+the consumer writes 'head'; each publishes its slot before moving its own counter, and
+(under the GIL) these single assignments are atomic, so the single-producer/single-consumer
+(SPSC) mode needs no lock at all. In multi-producer (MPSC) mode, producers serialise on one
+lock between themselves, but the consumer still never takes it. """
+class RingBufferQueue:
+    """ how many times a blocked call yields the GIL (via sleep(0)) before it starts backing
+    off w/ real sleeps, and the longest such sleep in seconds. """
+    SPIN_LIMIT = 64
+    MAX_BACKOFF = 0.001
+
+    def __init__(self, capacity, multi_producer=False):
+        self.capacity = 1
+        while self.capacity < capacity:
+            self.capacity *= 2
+        self.mask = self.capacity - 1
+        self.buffer = [None] * self.capacity
+        """ 'head'/'tail' count every item ever dequeued/enqueued; their difference is the
+        number of items in the buffer. """
+        self.head = 0
+        self.tail = 0
+        self.producer_lock = threading.Lock() if multi_producer else None
+
+    def __wait(self, ready, block, timeout, exception):
+        """ spin, then back off exponentially, until ready() holds. Polling keeps both ends
+        lock-free; a parked thread costs at most MAX_BACKOFF of extra latency. """
+        if not block:
+            raise exception
+        end_time = None if timeout is None else monotonic() + timeout
+        spins = 0
+        backoff = 0.00001
+        while not ready():
+            if end_time is not None and monotonic() >= end_time:
+                raise exception
+            if spins < self.SPIN_LIMIT:
+                spins += 1
+                sleep(0)
+            else:
+                sleep(backoff)
+                backoff = min(backoff * 2, self.MAX_BACKOFF)
+
+    def __has_space(self):
+        return self.tail - self.head < self.capacity
+
+    def __has_items(self):
+        return self.head != self.tail
+
+    def __put(self, item, block, timeout):
+        tail = self.tail
+        if tail - self.head >= self.capacity:
+            self.__wait(self.__has_space, block, timeout, Full)
+        self.buffer[tail & self.mask] = item
+        """ the item is in its slot before the new tail makes it visible to the consumer. """
+        self.tail = tail + 1
+
+    def enqueue(self, item, block=True, timeout=None):
+        if self.producer_lock is None:
+            self.__put(item, block, timeout)
+            return
+        """ waiting for the producer lock counts against the same 'block'/'timeout' as waiting
+        for space, as another producer may hold it while parked on a full buffer. As w/
+        Queue, 'timeout' is ignored if block is False. """
+        start = monotonic()
+        if not block:
+            acquired = self.producer_lock.acquire(False)
+        elif timeout is None:
+            acquired = self.producer_lock.acquire()
+        elif timeout < 0:
+            raise ValueError("'timeout' must be a non-negative number.")
+        else:
+            acquired = self.producer_lock.acquire(True, timeout)
+        if not acquired:
+            raise Full
+        try:
+            remaining = None if timeout is None else max(timeout - (monotonic() - start), 0)
+            self.__put(item, block, remaining)
+        finally:
+            self.producer_lock.release()
+
+    def dequeue(self, block=True, timeout=None):
+        """ must only ever be called from one consumer thread at a time. """
+        head = self.head
+        if head == self.tail:
+            self.__wait(self.__has_items, block, timeout, Empty)
+        index = head & self.mask
+        item = self.buffer[index]
+        """ drop the buffer's reference, so dequeued items can be freed, before releasing the
+        slot to producers. """
+        self.buffer[index] = None
+        self.head = head + 1
+        return item
+
+    def empty(self):
+        return self.head == self.tail
+
+    def qsize(self):
+        return self.tail - self.head
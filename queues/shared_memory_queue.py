@@ -0,0 +1,224 @@
+from multiprocessing import shared_memory
+from time import monotonic
+import multiprocessing
+import struct
+
+from thread_safety_wrapper import Empty, Full, Closed
+
+""" the shared block starts w/ a header of three unsigned 64-bit counters: the number of
+bytes ever dequeued ('head') and enqueued ('tail'), and the number of items in the queue.
+Their byte positions in the ring are the counters modulo its capacity. The header is
+followed by the closed flag (see close()), then the ring. In byte mode, each record is its
+payload prefixed w/ its length. """
+HEADER = struct.Struct("<QQQ")
+CLOSED = struct.Struct("<Q")
+RING = HEADER.size + CLOSED.size
+LENGTH = struct.Struct("<I")
+
+""" a FIFO queue shared between processes. Items live in a multiprocessing.shared_memory
+ring buffer rather than being pickled through a pipe (as multiprocessing.Queue does), so a
+record is copied once into the block by the producer and once out of it by the consumer.
+Items are either bytes-like (stored as length-prefixed records and dequeued as bytes) or,
+given a struct format such as "<qd", tuples packed into fixed-size records and dequeued as
+tuples. A queue is created in one process and handed to others as a multiprocessing.Process
+argument; each process then works on the same block, lock and conditions. The API matches
+Queue's, including close(); detach() and unlink() release the shared block itself. """
+class SharedMemoryQueue:
+    def __init__(self, maxsize=None, capacity=1 << 20, record_format=None, context=None):
+        """ 'capacity' is the size of the ring in bytes, and 'maxsize' (if given) caps the
+        number of items; enqueuing blocks (or raises Full) when either limit is reached.
+        'context' is the multiprocessing context (e.g. get_context("spawn")) the processes
+        sharing the queue are started from, if not the default one. """
+        self.maxsize = maxsize or 0
+        self.capacity = capacity
+        self.record_format = record_format
+        self.record = None if record_format is None else struct.Struct(record_format)
+        if self.record is not None and self.record.size > capacity:
+            raise ValueError("Records are larger than the queue's capacity.")
+        self.shm = shared_memory.SharedMemory(create=True, size=RING + capacity)
+        HEADER.pack_into(self.shm.buf, 0, 0, 0, 0)
+        CLOSED.pack_into(self.shm.buf, HEADER.size, 0)
+        """ as in ThreadSafetyWrapper, both conditions share one mutex, but these are
+        process-shared primitives from multiprocessing rather than threading. """
+        context = context or multiprocessing.get_context()
+        self.mutex = context.Lock()
+        self.not_empty = context.Condition(self.mutex)
+        self.not_full = context.Condition(self.mutex)
+
+    """ struct.Struct objects can't be pickled, so the record format is rebuilt from its
+    string when the queue is sent to another process. The SharedMemory object pickles by
+    name and reattaches to the same block. """
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["record"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.record = None if self.record_format is None else struct.Struct(self.record_format)
+
+    @property
+    def closed(self):
+        return CLOSED.unpack_from(self.shm.buf, HEADER.size)[0] != 0
+
+    def __wait(self, condition, ready, block, timeout, exception):
+        """ identical to ThreadSafetyWrapper's, closing included; must be called w/ the mutex
+        held. """
+        if ready():
+            return
+        if self.closed:
+            raise Closed
+        if not block:
+            raise exception
+        if timeout is None:
+            while not ready():
+                condition.wait()
+                if self.closed and not ready():
+                    raise Closed
+            return
+        if timeout < 0:
+            raise ValueError("'timeout' must be a non-negative number.")
+        end_time = monotonic() + timeout
+        while not ready():
+            remaining = end_time - monotonic()
+            if remaining <= 0:
+                raise exception
+            condition.wait(remaining)
+            if self.closed and not ready():
+                raise Closed
+
+    def __encode(self, item):
+        if self.record is not None:
+            return self.record.pack(*item)
+        """ len() of a memoryview, array or NumPy array counts its elements rather than its
+        bytes, so the prefix is taken from the bytes actually written. """
+        data = bytes(memoryview(item))
+        record = LENGTH.pack(len(data)) + data
+        """ a record that can never fit would otherwise wait for space forever. """
+        if len(record) > self.capacity:
+            raise ValueError("Item is larger than the queue's capacity.")
+        return record
+
+    def __has_space(self, num_bytes):
+        if self.closed:
+            return False
+        head, tail, num_items = HEADER.unpack_from(self.shm.buf, 0)
+        if self.maxsize and num_items >= self.maxsize:
+            return False
+        return tail - head + num_bytes <= self.capacity
+
+    def __has_items(self):
+        return HEADER.unpack_from(self.shm.buf, 0)[2] > 0
+
+    """ copy 'data' into the ring at byte counter 'position', wrapping around its end if need
+    be; and the reverse. """
+    def __write(self, position, data):
+        buf = self.shm.buf
+        start = position % self.capacity
+        first = min(len(data), self.capacity - start)
+        buf[RING + start:RING + start + first] = data[:first]
+        if first < len(data):
+            buf[RING:RING + len(data) - first] = data[first:]
+
+    def __read(self, position, num_bytes):
+        buf = self.shm.buf
+        start = position % self.capacity
+        first = min(num_bytes, self.capacity - start)
+        data = bytes(buf[RING + start:RING + start + first])
+        if first < num_bytes:
+            data += bytes(buf[RING:RING + num_bytes - first])
+        return data
+
+    def __put(self, record):
+        """ must be called w/ the mutex held, once there's space for the record. """
+        head, tail, num_items = HEADER.unpack_from(self.shm.buf, 0)
+        self.__write(tail, record)
+        HEADER.pack_into(self.shm.buf, 0, head, tail + len(record), num_items + 1)
+
+    def __get(self):
+        """ must be called w/ the mutex held, once there's an item. """
+        head, tail, num_items = HEADER.unpack_from(self.shm.buf, 0)
+        if self.record is not None:
+            item = self.record.unpack(self.__read(head, self.record.size))
+            head += self.record.size
+        else:
+            length = LENGTH.unpack(self.__read(head, LENGTH.size))[0]
+            item = self.__read(head + LENGTH.size, length)
+            head += LENGTH.size + length
+        HEADER.pack_into(self.shm.buf, 0, head, tail, num_items - 1)
+        return item
+
+    def enqueue(self, item, block=True, timeout=None):
+        record = self.__encode(item)
+        with self.mutex:
+            if self.closed:
+                raise Closed
+            self.__wait(self.not_full, lambda: self.__has_space(len(record)), block, timeout, Full)
+            self.__put(record)
+            self.not_empty.notify()
+
+    def dequeue(self, block=True, timeout=None):
+        with self.mutex:
+            self.__wait(self.not_empty, self.__has_items, block, timeout, Empty)
+            item = self.__get()
+            """ a freed fixed-size record makes room for exactly one more, but a freed byte
+            record may make room for several smaller ones. """
+            if self.record is not None:
+                self.not_full.notify()
+            else:
+                self.not_full.notify_all()
+            return item
+
+    def enqueue_many(self, items, block=True, timeout=None):
+        """ as Queue.enqueue_many(): each pass waits (if allowed) for room for the next record,
+        then writes as many records as fit under the mutex. If the queue stays full part-way,
+        Full is raised and the items already enqueued stay in the queue. """
+        records = [self.__encode(item) for item in items]
+        start = 0
+        while start < len(records):
+            with self.mutex:
+                if self.closed:
+                    raise Closed
+                self.__wait(self.not_full, lambda: self.__has_space(len(records[start])), block, timeout, Full)
+                num_records = 0
+                while start < len(records) and self.__has_space(len(records[start])):
+                    self.__put(records[start])
+                    start += 1
+                    num_records += 1
+                self.not_empty.notify(num_records)
+
+    def dequeue_many(self, max_items, block=True, timeout=None):
+        """ wait (up to timeout seconds, if given) for at least one item, then dequeue up to
+        max_items of those available, oldest first. """
+        with self.mutex:
+            self.__wait(self.not_empty, self.__has_items, block, timeout, Empty)
+            num_items = min(max_items, HEADER.unpack_from(self.shm.buf, 0)[2])
+            items = [self.__get() for _ in range(num_items)]
+            self.not_full.notify_all()
+            return items
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def qsize(self):
+        return HEADER.unpack_from(self.shm.buf, 0)[2]
+
+    def close(self):
+        """ shut the queue down, as Queue.close() does, in every process sharing it: every
+        further enqueue raises Closed, dequeues carry on until the remaining items run out
+        and then raise Closed, and every process currently blocked is woken up to re-check.
+        The shared block stays mapped; see detach(). """
+        with self.mutex:
+            CLOSED.pack_into(self.shm.buf, HEADER.size, 1)
+            self.not_empty.notify_all()
+            self.not_full.notify_all()
+
+    def detach(self):
+        """ unmap the shared block from this process; every process should call this once
+        it's done w/ the queue, after which the queue mustn't be used in that process. """
+        self.shm.close()
+
+    def unlink(self):
+        """ free the shared block. Call this once, from the creating process, after the other
+        processes are done w/ it. """
+        self.shm.unlink()
@@ -1,20 +1,38 @@
 from collections import deque
 
+from thread_safety_wrapper import ThreadSafetyWrapper
+
 """ a queue derivation in which elements must join and leave via the top. """
 class Stack(ThreadSafetyWrapper):
     def __init__(self, maxsize=None):
         self.stack = deque()
         super().__init__(maxsize)
 
-    def push(self, item, block=True):
-        with self.protect_put(block):
+    def push(self, item, block=True, timeout=None):
+        with self.protect_put(block, timeout):
             self.stack.append(item)
 
-    def pop(self, block=True):
-        with self.protect_get(block):
+    def pop(self, block=True, timeout=None):
+        with self.protect_get(block, timeout):
             """ dequeue.pop() removes and returns the left-most item. """
             return self.stack.pop()
             
+    def push_many(self, items, block=True, timeout=None):
+        """ the Stack counterpart of Queue.enqueue_many(); items are pushed in order, so the 
+        last one ends up on top. """
+        items = list(items)
+        start = 0
+        while start < len(items):
+            with self.protect_put_many(len(items) - start, block, timeout) as num_items:
+                self.stack.extend(items[start:start + num_items])
+            start += num_items
+
+    def pop_many(self, max_items, block=True, timeout=None):
+        """ wait for at least one item, then pop up to max_items, top first. """
+        with self.protect_get_many(max_items, block, timeout) as num_items:
+            pop = self.stack.pop
+            return [pop() for _ in range(num_items)]
+
     def empty(self):
         return len(self.stack) == 0
 
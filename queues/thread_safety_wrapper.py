@@ -1,58 +1,240 @@
 from contextlib import contextmanager
+from functools import partial
+from time import monotonic, perf_counter
 import threading
 
+from queue_metrics import QueueMetrics
+
 class Empty(Exception):
-    """ raised when attempting to dequeue from an empty container (i.e. count can't be 
-    acquired in ThreadSafetyWrapper.protect_get()). """
+    """ raised when attempting to dequeue from an empty container (i.e. no item arrives
+    before ThreadSafetyWrapper.protect_get() gives up waiting). """
     pass
 
 class Full(Exception):
-    """ raised when attempting to enqueue into a full container (i.e. space can't be 
-    acquired in ThreadSafetyWrapper.protect_put()). """
+    """ raised when attempting to enqueue into a full container (i.e. no space frees up
+    before ThreadSafetyWrapper.protect_put() gives up waiting). """
+    pass
+
+class Closed(Exception):
+    """ raised when attempting to enqueue into a closed container, or to dequeue from one
+    that is both closed and empty. """
     pass
 
-""" ensure that enqueue/dequeue are atomic (occur without any intermediate states visible 
-to other threads), protecting them against race conditions (multiple threads accessing 
+""" ensure that enqueue/dequeue are atomic (occur without any intermediate states visible
+to other threads), protecting them against race conditions (multiple threads accessing
 shared data concurrently). """
 class ThreadSafetyWrapper:
+    """ the (put, get, is batch) method names whose items enable_metrics() samples dwell times 
+    from; those a container doesn't have are skipped. """
+    DWELL_METHODS = (("enqueue", "dequeue", False), ("enqueue_many", "dequeue_many", True),
+                     ("push", "pop", False), ("push_many", "pop_many", True))
+
     def __init__(self, maxsize=None):
-        """ threading.Semaphore() implements a semaphore. This synchronisation primitive 
-        (mechanism to coordinate the execution of multiple threads in a concurrent system) 
-        manages an atomic counter representing the number of release() - acquire() calls, 
-        plus an initial value. acquire() blocks if necessary until it can return without 
-        making the counter negative. """
-        self.count = threading.Semaphore(0)
-        """ self.count/space manages the number items/available space. """
-        self.space = threading.Semaphore(maxsize) if maxsize else None
-        """ threading.Lock() implements a primitive lock object; once a thread has acquired it, 
-        subsequent attempts to acquire it block, until it's released; any thread may release it. """
+        """ threading.Lock() implements a primitive lock object; once a thread has acquired it,
+        subsequent attempts to acquire it block, until it's released; any thread may release it.
+        Every operation on the underlying container happens while holding this one mutex. """
         self.mutex = threading.Lock()
+        """ threading.Condition() implements a condition variable. This synchronisation primitive
+        (mechanism to coordinate the execution of multiple threads in a concurrent system) lets
+        a thread holding the shared mutex wait() (releasing it) until another thread notify()s
+        it that the state it's waiting for may have changed. All three conditions share
+        'mutex', so checking the state and waiting happen atomically. """
+        self.not_empty = threading.Condition(self.mutex)
+        self.not_full = threading.Condition(self.mutex)
+        self.all_tasks_done = threading.Condition(self.mutex)
+        self.maxsize = maxsize or 0
+        """ self.num_items is the number of items in the container; unfinished_tasks is the
+        number enqueued but not yet marked done via task_done(). """
+        self.num_items = 0
+        self.unfinished_tasks = 0
+        self.closed = False
+        """ see enable_metrics(). """
+        self.metrics = None
+        self.instrumented = []
+
+    def __wait(self, condition, ready, block, timeout, exception):
+        """ wait on condition until ready() holds. If block is False, raise exception straight
+        away; if timeout is given, raise it once that many seconds have passed. Closing the
+        container wakes every waiter, which then raises Closed. Must be called w/ the mutex
+        held. """
+        if ready():
+            return
+        if self.closed:
+            raise Closed
+        if not block:
+            raise exception
+        if timeout is None:
+            while not ready():
+                condition.wait()
+                if self.closed and not ready():
+                    raise Closed
+            return
+        if timeout < 0:
+            raise ValueError("'timeout' must be a non-negative number.")
+        end_time = monotonic() + timeout
+        while not ready():
+            remaining = end_time - monotonic()
+            if remaining <= 0:
+                raise exception
+            condition.wait(remaining)
+            if self.closed and not ready():
+                raise Closed
+
+    def __has_space(self):
+        return not self.closed and (not self.maxsize or self.num_items < self.maxsize)
+
+    def __has_items(self):
+        return self.num_items > 0
+
+    """ contextlib.contextmanager is a decorator (function that returns another function
+    via a transformative @wrapper) that defines a factory function for with statements
+    without __enter__() and __exit__(). The body of the with statement runs while holding
+    the mutex, once there's space/an item. If block is True, the thread blocks until it
+    can proceed with the operation (or timeout seconds pass). If it's False, the thread
+    immediately raises if the operation can't be performed. """
+    @contextmanager
+    def protect_put(self, block=True, timeout=None):
+        with self.mutex:
+            if self.closed:
+                raise Closed
+            self.__wait(self.not_full, self.__has_space, block, timeout, Full)
+            yield
+            self.num_items += 1
+            self.unfinished_tasks += 1
+            """ threading.Condition.notify() wakes up one thread waiting on the condition,
+            if any. """
+            self.not_empty.notify()
+
+    @contextmanager
+    def protect_get(self, block=True, timeout=None):
+        with self.mutex:
+            self.__wait(self.not_empty, self.__has_items, block, timeout, Empty)
+            yield
+            self.num_items -= 1
+            self.not_full.notify()
+
+    """ batch counterparts of protect_put()/protect_get(). Wait (if allowed) for the first
+    slot/item only, then claim as many as are available, up to num_items/max_items. The
+    number claimed is yielded, so the caller moves that many items in the same critical
+    section, and waiting threads are notified once per batch. """
+    @contextmanager
+    def protect_put_many(self, num_items, block=True, timeout=None):
+        with self.mutex:
+            if self.closed:
+                raise Closed
+            self.__wait(self.not_full, self.__has_space, block, timeout, Full)
+            acquired = min(num_items, self.maxsize - self.num_items) if self.maxsize else num_items
+            yield acquired
+            self.num_items += acquired
+            self.unfinished_tasks += acquired
+            self.not_empty.notify(acquired)
 
-    """ contextlib.contextmanager is a decorator (function that returns another function 
-    via a transformative @wrapper) that defines a factory function for with statements 
-    without __enter__() and __exit__(). If block is True, the thread blocks until it 
-    can proceed with the operation. If it's False, the thread immediately returns 
-    if the operation can't be performed. """
     @contextmanager
-    def protect_put(self, block):
-        """ threading.Semaphore.acquire() acquires a semaphore. When blocking=True, if 
-        the counter > 0 on entry,decrement it by 1 and return True immediately. If it's 
-        0 on entry, block until awoken by a call to release(). Once awoken (and the counter > 0), 
-        decrement the counter by 1 and return True. When blocking=False, if a call without an 
-        argument would block, return False immediately. Otherwise, do the same thing as when 
-        called without arguments, and return True. """
-        if self.space and not self.space.acquire(block): 
-            raise Full
-        yield
-        """ threading.Semaphore.release(n=1) releases a semaphore, incrementing the counter 
-        by n. When it was 0 on entry and other threads are waiting for it to become > zero again, 
-        wake up n of those threads. """
-        self.count.release()
+    def protect_get_many(self, max_items, block=True, timeout=None):
+        with self.mutex:
+            self.__wait(self.not_empty, self.__has_items, block, timeout, Empty)
+            acquired = min(max_items, self.num_items)
+            yield acquired
+            self.num_items -= acquired
+            self.not_full.notify(acquired)
+
+    def enable_metrics(self, metrics=None):
+        """ start recording metrics (see QueueMetrics) into 'metrics', or a new QueueMetrics, 
+        and return it. The instrumented methods are bound to this instance only, shadowing 
+        the class's, so a queue w/o metrics runs exactly the same code as before. """
+        if self.metrics is not None:
+            self.disable_metrics()
+        self.metrics = metrics or QueueMetrics()
+        instrumented = {"_ThreadSafetyWrapper__wait": self.__measured_wait}
+        for name in ("protect_put", "protect_get", "protect_put_many", "protect_get_many"):
+            instrumented[name] = partial(self.__measured, getattr(type(self), name), name.startswith("protect_put"))
+        for put_name, get_name, many in self.DWELL_METHODS:
+            if hasattr(self, put_name) and hasattr(self, get_name):
+                instrumented[put_name] = self.metrics.track_put(getattr(self, put_name), many)
+                instrumented[get_name] = self.metrics.track_get(getattr(self, get_name), many)
+        for name, method in instrumented.items():
+            setattr(self, name, method)
+        self.instrumented = list(instrumented)
+        return self.metrics
+
+    def disable_metrics(self):
+        """ stop recording metrics, removing the instrumented methods; return the metrics 
+        recorded so far. """
+        metrics = self.metrics
+        for name in self.instrumented:
+            delattr(self, name)
+        self.instrumented = []
+        self.metrics = None
+        return metrics
+
+    def __measured_wait(self, condition, ready, block, timeout, exception):
+        """ __wait(), adding the time spent blocked to the metrics. If it returns, that time 
+        is also left in metrics.blocked for __measured() to tell apart from waiting for 
+        the mutex; this needs no thread-local storage, as the mutex is held from here until 
+        __measured() reads it. """
+        start = perf_counter()
+        try:
+            ThreadSafetyWrapper.__wait(self, condition, ready, block, timeout, exception)
+        except BaseException:
+            self.__record_blocked(condition, perf_counter() - start)
+            raise
+        self.metrics.blocked = self.__record_blocked(condition, perf_counter() - start)
+
+    def __record_blocked(self, condition, blocked):
+        if condition is self.not_full:
+            self.metrics.put_blocked += blocked
+        else:
+            self.metrics.get_blocked += blocked
+        return blocked
 
     @contextmanager
-    def protect_get(self, block):
-        if not self.count.acquire(block): 
-            raise Empty
-        yield
-        if self.space: 
-            self.space.release()
+    def __measured(self, protect, put, *args, **kwargs):
+        """ run the protect_*() context manager 'protect', recording its counts, lock wait 
+        and hold times, and the high-water mark; everything is recorded while the mutex 
+        is still held. """
+        metrics = self.metrics
+        start = perf_counter()
+        try:
+            with protect(self, *args, **kwargs) as acquired:
+                acquired_at = perf_counter()
+                metrics.lock_wait.record(acquired_at - start - metrics.blocked)
+                metrics.blocked = 0.0
+                yield acquired
+                num_items = 1 if acquired is None else acquired
+                if put:
+                    metrics.enqueued += num_items
+                    if self.num_items + num_items > metrics.high_water_mark:
+                        metrics.high_water_mark = self.num_items + num_items
+                else:
+                    metrics.dequeued += num_items
+                now = perf_counter()
+                metrics.lock_hold.record(now - acquired_at)
+        except (Full, Empty):
+            metrics.record_failure(put)
+            raise
+        metrics.maybe_report(now)
+
+    def task_done(self):
+        """ indicate that a previously dequeued item has been fully processed. When every
+        enqueued item has been marked done, threads blocked in join() are released. """
+        with self.mutex:
+            if self.unfinished_tasks <= 0:
+                raise ValueError("task_done() called too many times.")
+            self.unfinished_tasks -= 1
+            if self.unfinished_tasks == 0:
+                self.all_tasks_done.notify_all()
+
+    def join(self):
+        """ block until every item that has been enqueued has been marked done. """
+        with self.mutex:
+            while self.unfinished_tasks:
+                self.all_tasks_done.wait()
+
+    def close(self):
+        """ shut the container down: every further enqueue raises Closed, dequeues carry on
+        until the remaining items run out and then raise Closed, and every thread currently
+        blocked is woken up to re-check. """
+        with self.mutex:
+            self.closed = True
+            self.not_empty.notify_all()
+            self.not_full.notify_all()
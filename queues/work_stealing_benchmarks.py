@@ -0,0 +1,83 @@
+""" compare WorkStealingPool against concurrent.futures.ThreadPoolExecutor on fine-grained recursive tasks, run w/
+`python work_stealing_benchmarks.py [depth]`. Every task of a binary tree of 2**(depth + 1) - 1 tasks submits its two
+children (down to the leaves), then:
+    fire-and-forget:  returns straight away; the run ends once every task has counted itself done.
+    recursive wait:   waits on its children via pool.wait() and returns the sum of their results. Only the work-stealing
+                      pool can do this: a ThreadPoolExecutor task blocking on a child can tie up every worker.
+Each is reported in tasks per second for 1 and 4 workers, as the best of 3 runs. ThreadPoolExecutor takes every task from
+one shared, locked queue, while the pool's workers mostly take from their own deques. """
+from time import perf_counter
+import sys
+import threading
+
+""" this directory's queue.py shadows the standard library's queue module, which ThreadPoolExecutor imports. So the
+executor is imported first, w/ this directory briefly off sys.path, and the stdlib queue module is then dropped from
+sys.modules (the executor keeps its own reference), so that the pool's imports find the local modules. """
+script_directory = sys.path.pop(0)
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, script_directory)
+del sys.modules["queue"]
+
+from work_stealing_pool import WorkStealingPool
+
+
+class Countdown:
+    """ set 'done' once count_down() has been called 'count' times. """
+    def __init__(self, count):
+        self.count = count
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+
+    def count_down(self):
+        with self.lock:
+            self.count -= 1
+            if not self.count:
+                self.done.set()
+
+
+def fire_and_forget(executor, depth):
+    countdown = Countdown(2 ** (depth + 1) - 1)
+
+    def task(level):
+        if level:
+            executor.submit(task, level - 1)
+            executor.submit(task, level - 1)
+        countdown.count_down()
+
+    executor.submit(task, depth)
+    countdown.done.wait()
+
+def recursive_wait(pool, depth):
+    def task(level):
+        if not level:
+            return 1
+        left, right = pool.submit(task, level - 1), pool.submit(task, level - 1)
+        return pool.wait(left) + pool.wait(right) + 1
+
+    assert pool.wait(pool.submit(task, depth)) == 2 ** (depth + 1) - 1
+
+EXECUTORS = {
+    "WorkStealingPool": WorkStealingPool,
+    "ThreadPoolExecutor": ThreadPoolExecutor,
+}
+
+
+def throughput(run, factory, num_workers, depth):
+    with factory(num_workers) as executor:
+        start = perf_counter()
+        run(executor, depth)
+        seconds = perf_counter() - start
+    return (2 ** (depth + 1) - 1) / seconds
+
+def benchmark(depth=16):
+    print(f"{'executor':<20}{'workers':>8}{'fire-and-forget':>17}{'recursive wait':>16}")
+    for num_workers in (1, 4):
+        for name, factory in EXECUTORS.items():
+            fired = max(throughput(fire_and_forget, factory, num_workers, depth) for _ in range(3))
+            waited = (f"{max(throughput(recursive_wait, factory, num_workers, depth) for _ in range(3)):>16,.0f}"
+                      if factory is WorkStealingPool else f"{'-':>16}")
+            print(f"{name:<20}{num_workers:>8}{fired:>17,.0f}{waited}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 16)
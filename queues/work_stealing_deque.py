@@ -0,0 +1,36 @@
+from collections import deque
+
+from thread_safety_wrapper import Empty
+
+""" a double-ended queue shared between one owner and any number of thieves. The owner
+pushes and pops at the bottom, using it as a stack (so it works on its newest, most
+cache-friendly task first), while thieves steal from the top, taking the oldest task,
+which in recursive workloads tends to be the largest piece of remaining work. Both ends
+map onto single deque operations, which are atomic, so neither needs a lock. """
+class WorkStealingDeque:
+    def __init__(self):
+        self.deque = deque()
+
+    def push(self, item):
+        """ only to be called by the owner. """
+        self.deque.append(item)
+
+    def pop(self):
+        """ only to be called by the owner; raise Empty if there's nothing to pop. """
+        try:
+            return self.deque.pop()
+        except IndexError:
+            raise Empty from None
+
+    def steal(self):
+        """ may be called by any thread; raise Empty if there's nothing to steal. """
+        try:
+            return self.deque.popleft()
+        except IndexError:
+            raise Empty from None
+
+    def empty(self):
+        return len(self.deque) == 0
+
+    def size(self):
+        return len(self.deque)
@@ -0,0 +1,142 @@
+from concurrent.futures import Future, wait as wait_for_futures
+from random import randrange
+import threading
+
+from thread_safety_wrapper import Empty
+from work_stealing_deque import WorkStealingDeque
+
+""" a thread pool that schedules tasks by work stealing. Each worker owns a WorkStealingDeque:
+tasks submitted by a running task go onto its worker's own deque, and the worker takes its
+next task from there, newest first. Tasks submitted from outside the pool go into a shared
+injection deque. A worker w/ nothing of its own takes from that, then tries to steal from
+the other workers (starting at a random victim, so thieves spread out), and only sleeps
+when there's no work anywhere. Workers therefore rarely touch shared state, unlike a pool
+in which every submission and every take goes through one locked queue.
+
+A task that needs the result of a task it submitted should call pool.wait(future) rather
+than future.result(): a worker waiting in wait() keeps running other tasks until the
+future is done, so recursive tasks can't tie up every worker waiting on their children. """
+class WorkStealingPool:
+    def __init__(self, num_workers=4):
+        self.deques = [WorkStealingDeque() for _ in range(num_workers)]
+        self.injector = WorkStealingDeque()
+        """ idle workers sleep on 'work_available'. A worker counts itself as idle before it
+        last checks for work, and submitters read the count after pushing, so a submission
+        either is seen by that check or wakes the worker. """
+        self.work_available = threading.Condition()
+        self.idle_workers = 0
+        self.shutting_down = False
+        """ 'local.index' is the current thread's worker index, if it's one of this pool's. """
+        self.local = threading.local()
+        self.workers = [threading.Thread(target=self.__work, args=(index,), daemon=True)
+                        for index in range(num_workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def submit(self, function, *args, **kwargs):
+        """ schedule function(*args, **kwargs) and return a concurrent.futures.Future for its
+        result. """
+        if self.shutting_down:
+            raise RuntimeError("Can't submit tasks after shutdown.")
+        future = Future()
+        task = (future, function, args, kwargs)
+        index = getattr(self.local, "index", None)
+        if index is None:
+            self.injector.push(task)
+        else:
+            self.deques[index].push(task)
+        if self.idle_workers:
+            with self.work_available:
+                self.work_available.notify()
+        return future
+
+    def map(self, function, *iterables):
+        """ as Executor.map(): submit function over the iterables straight away, then yield
+        the results in order. May be used from within a task, as the results are collected
+        w/ wait(). """
+        futures = [self.submit(function, *args) for args in zip(*iterables)]
+        return (self.wait(future) for future in futures)
+
+    def wait(self, future):
+        """ return the future's result (or raise its exception). On a worker thread, run
+        other tasks while it isn't done yet, rather than blocking. """
+        index = getattr(self.local, "index", None)
+        if index is not None:
+            while not future.done():
+                task = self.__find_task(index)
+                if task is None:
+                    """ the only remaining work is running on other workers; wait briefly
+                    for the future, then look for new tasks again. """
+                    wait_for_futures((future,), timeout=0.001)
+                else:
+                    self.__run(task)
+        return future.result()
+
+    def __find_task(self, index):
+        """ return the next task for worker 'index': its own newest, else the oldest injected
+        one, else one stolen from another worker; or None if there are none. """
+        try:
+            return self.deques[index].pop()
+        except Empty:
+            pass
+        try:
+            return self.injector.steal()
+        except Empty:
+            pass
+        num_workers = len(self.deques)
+        start = randrange(num_workers)
+        for offset in range(num_workers):
+            victim = (start + offset) % num_workers
+            if victim != index:
+                try:
+                    return self.deques[victim].steal()
+                except Empty:
+                    pass
+        return None
+
+    def __has_work(self):
+        return not self.injector.empty() or any(not worker_deque.empty() for worker_deque in self.deques)
+
+    @staticmethod
+    def __run(task):
+        future, function, args, kwargs = task
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as exception:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def __work(self, index):
+        self.local.index = index
+        while True:
+            task = self.__find_task(index)
+            if task is not None:
+                self.__run(task)
+                continue
+            with self.work_available:
+                self.idle_workers += 1
+                if not self.__has_work():
+                    if self.shutting_down:
+                        self.idle_workers -= 1
+                        return
+                    self.work_available.wait()
+                self.idle_workers -= 1
+
+    def shutdown(self, wait=True):
+        """ stop accepting tasks; workers exit once every submitted task has run. If wait is
+        True, block until they have. """
+        with self.work_available:
+            self.shutting_down = True
+            self.work_available.notify_all()
+        if wait:
+            for worker in self.workers:
+                worker.join()